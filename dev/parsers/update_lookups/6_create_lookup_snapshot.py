@@ -0,0 +1,22 @@
+# Compile the unit lookups into a binary snapshot that the unit parser loads instead of the JSON files.
+# The snapshot also contains the indexes derived from the lookups (e.g., the surface form link table),
+# so that they are not built again every time the unit parser is loaded.
+# The snapshot stores the hashes of the JSON files it was built from. If the JSON files are changed 
+# afterwards, the snapshot is considered stale and the unit parser falls back to the JSON files
+# until this script is run again.
+
+from pathlib import Path
+from quinex_utils.parsers.utils.unit_lookups import create_unit_lookup_snapshot, load_unit_lookup_snapshot
+
+
+# =============================================================
+# =                       Configuration                       =
+# =============================================================
+static_resources_dir = Path("src/quinex_utils/parsers/static_resources/")
+
+
+snapshot_path = create_unit_lookup_snapshot(static_resources_dir)
+assert load_unit_lookup_snapshot(static_resources_dir) is not None, "Snapshot could not be loaded."
+
+print(f"Saved snapshot to {snapshot_path} ({snapshot_path.stat().st_size / 1e6:.1f} MB).")
+print("Finished")
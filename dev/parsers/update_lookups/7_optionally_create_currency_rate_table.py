@@ -0,0 +1,34 @@
+# Snapshot yearly consumer price indices and exchange rates from cucopy into a local currency 
+# rate table. If the table exists, the unit parser uses it for currency conversion instead of 
+# cucopy, which allows converting currencies offline. Requires cucopy and internet access.
+
+import json
+from pathlib import Path
+from datetime import datetime
+from quinex_utils.parsers.utils.currency_rates import create_currency_rate_table, load_currency_rate_table
+
+
+# =============================================================
+# =                       Configuration                       =
+# =============================================================
+static_resources_dir = Path("src/quinex_utils/parsers/static_resources/")
+first_year = 1990
+last_year = datetime.now().year - 1
+
+
+# Get ISO codes of all currencies known to the unit parser.
+with open(static_resources_dir / "unit_dimensions_and_kinds.json", 'r') as f:
+    unit_dimensions_and_kinds = json.load(f)
+
+currencies = set()
+for uri, info in unit_dimensions_and_kinds.items():
+    if info["is_currency"]:
+        iso_code = uri.removeprefix("http://qudt.org/vocab/currency/").removeprefix("http://qudt.org/vocab/unit/CCY_")
+        if len(iso_code) == 3:
+            currencies.add(iso_code)
+
+table_path = create_currency_rate_table(sorted(currencies), range(first_year, last_year + 1), static_resources_dir / "currency_rates.json", verbose=True)
+table = load_currency_rate_table(table_path)
+
+print(f"Saved CPI data for {len(table.cpi)} and exchange rates for {len(table.exchange_rates)} of {len(currencies)} currencies to {table_path}.")
+print("Finished")
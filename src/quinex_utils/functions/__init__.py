@@ -1,4 +1,4 @@
-from .normalize import normalize_quantity_span, normalize_unit_span, rectify_quantity_annotation
+from .normalize import normalize_quantity_span, normalize_unit_span, normalize_unit_group, rectify_quantity_annotation
 from .num2str import num2str
 from .str2num import str2num
 from .units import remove_exponent_from_ucum_code_of_single_unit
\ No newline at end of file
@@ -81,6 +81,30 @@ def normalize_unit_span(unit_str: str, quantity_normalization_already_done: bool
     return unit_str.strip(), display_unit_str
 
 
+def normalize_unit_group(group_str: str) -> tuple[str, str]:
+    """
+    Normalize the content of a parenthesized group of a unit string that has already been
+    normalized by normalize_unit_span(). Only the rules that depend on the start or end
+    of the string are applied again, because the group now starts and ends there
+    (e.g., '(per year)' to '/ year').
+    """
+
+    # Remove trailing dot and leading dash from unit string.
+    display_unit_str = group_str.strip().removesuffix('.').removeprefix('-').strip()
+
+    # Trim whitespace (e.g., from removed multiplication signs).
+    unit_str = re.sub(r"\s+", " ", display_unit_str)
+
+    # Remove leading multiplication signs and normalize leading division signs.
+    unit_str = re.sub(r"^[x×] ", " ", unit_str)
+    unit_str = re.sub(r"^per ", "/ ", unit_str)
+
+    # Remove trailing ":" from unit string.
+    unit_str = unit_str.removesuffix(':').removesuffix(';').removesuffix(',')
+
+    return unit_str.strip(), display_unit_str
+
+
 def normalize_num_span(num_span: str) -> str:
     num_span = num_span.removeprefix("+")
     num_span = num_span.lower()
@@ -1,9 +1,12 @@
 import itertools
 from decimal import *
-from typing import Union
+from typing import Union, Iterable, Iterator
 from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
 from text_processing_utils.char_offsets import is_inside
 from quinex_utils.parsers.unit_parser import FastSymbolicUnitParser
+from quinex_utils.parsers.utils.caching import LRUCache, CACHE_MISS, freeze_result, thaw_result
+from quinex_utils.parsers.utils.aho_corasick import AhoCorasickAutomaton
 from quinex_utils.functions import normalize_quantity_span
 from quinex_utils.functions.str2num import str2num, parse_value_and_order_of_magnitude_separately
 from quinex_utils.lookups.quantity_modifiers import PREFIXED_QUANTITY_MODIFIERS, SUFFIXED_QUANTITY_MODIFIERS, PREFIXED_QMOD_MATH_SYMBOLS, QUANTITY_MODIFIER_MAPPING, MATH_SYMBOLS_CONSIDERED_AS_PART_OF_QUANTITY_SPAN
@@ -39,10 +42,22 @@ from quinex_utils.parsers.utils.ambigous_candidate_filters import (
 
 
 
+# Role sets with these subsequences of roles are invalid (see get_token_roles()).
+INVALID_ROLE_SUBPATTERNS = [('range_separator', 'whitespace', 'range_separator')]
+INVALID_ROLE_SUBPATTERN_MATCHER = AhoCorasickAutomaton(INVALID_ROLE_SUBPATTERNS)
+
+# If the candidate role sets are exactly the key, only the value is kept.
+DOMINANT_ROLE_SETS = {
+    # Do not confuse ratios with units.
+    (('number', 'ratio_separator', 'number'), ('number', 'unit', 'number')): [('number', 'ratio_separator', 'number')],
+    (('number', 'whitespace', 'ratio_separator', 'whitespace', 'number'), ('number', 'whitespace', 'unit', 'whitespace', 'number')): [('number', 'whitespace', 'ratio_separator', 'whitespace', 'number')],
+}
+
+
 class FastSymbolicQuantityParser:
     """A fast and simple rule-based quantity parser."""
 
-    def __init__(self, error_if_no_success: bool=False, allow_evaluating_str_as_python_expr: bool=False, verbose: bool=False):              
+    def __init__(self, error_if_no_success: bool=False, allow_evaluating_str_as_python_expr: bool=False, verbose: bool=False, cache_size: int=0, max_role_sets: int=None):              
         self.unit_parser = FastSymbolicUnitParser(verbose=verbose)
         self.verbose = verbose
         self.RANGE_SEPARATORS = ["-", "to"]
@@ -59,14 +74,40 @@ class FastSymbolicQuantityParser:
             | QUANTITY_MODIFIER_MAPPING["statistical_modifiers"]
         )
         self.QMODS_IN_UNITS = ["min", "min.", "max", "max."]
+        # Prefixes of all modifiers that normalize_modifier() can normalize, which are used
+        # to stop extending windows that cannot become a modifier (see sliding_window_parser()).
+        self.PREFIXED_QUANTITY_MODIFIER_PREFIXES = get_modifier_prefixes([*self.PREFIXED_QUANTITY_MODIFIER_MAPPING, "a", "-", "+"])
+        self.SUFFIXED_QUANTITY_MODIFIER_PREFIXES = get_modifier_prefixes([*self.SUFFIXED_QUANTITY_MODIFIER_MAPPING, "a"])
         self.error_if_no_success = error_if_no_success
         self.allow_evaluating_str_as_python_expr = allow_evaluating_str_as_python_expr
 
+        # Maximum number of role sets of a quantity span that are considered (see get_token_roles()).
+        # No limit by default (max_role_sets=None). A limit bounds the parsing time of spans with many 
+        # ambiguous tokens but can change their results, since only the most preferred role sets are kept.
+        self.max_role_sets = max_role_sets
+
+        # Optional cache of frozen parse results, as quantity spans often repeat (e.g., '100%' or '1 kW').
+        # Disabled by default (cache_size=0).
+        self.parse_cache = LRUCache(maxsize=cache_size)
+
+
+    def cache_info(self) -> dict:
+        """Get hit, miss, and eviction counters as well as the size of the parse cache."""
+        return self.parse_cache.info()
+
+
+    def clear_cache(self):
+        """Remove all cached parse results and reset the counters."""
+        self.parse_cache.clear()
+
 
     def parse(self, quantity_span_agglomerate: str, simplify_results: bool=False) -> dict:
         """Dissect quantity span into value and unit, link unit class to unit and parse value to float.
         The parser fails silently, returning `'success': False`.
 
+        If the parser was created with cache_size > 0, results are cached. Each call returns 
+        a separate copy of the result, which can be modified without affecting the cache.
+
         Features:
             1. Dissects quantity span into value, units and modifiers.
             2. Determines the type of quantity span (single quantity, range, list, multidimensional).
@@ -107,6 +148,71 @@ class FastSymbolicQuantityParser:
                                         ...}, {...}]
             'type': 'range'}
         """
+        if self.parse_cache.maxsize == 0:
+            return self._parse(quantity_span_agglomerate, simplify_results)
+
+        key = (quantity_span_agglomerate, simplify_results, self.error_if_no_success, self.allow_evaluating_str_as_python_expr, self.max_role_sets)
+        cached_result = self.parse_cache.get(key)
+        if cached_result is CACHE_MISS:
+            result = self._parse(quantity_span_agglomerate, simplify_results)
+            # Store an immutable copy to prevent callers from corrupting the cache.
+            self.parse_cache.put(key, freeze_result(result))
+            return result
+
+        # Return a mutable copy of the cached result.
+        return thaw_result(cached_result)
+
+
+    def parse_batch(self, quantity_span_agglomerates: Iterable[str], simplify_results: bool=False, workers: int=1, chunksize: int=None) -> list[dict]:
+        """Parse many quantity spans. Each distinct quantity span is only parsed once.
+
+        Args:
+            quantity_span_agglomerates (Iterable[str]): Quantity spans to parse.
+            simplify_results (bool, optional): See parse().
+            workers (int, optional): Number of worker processes. If 1, the quantity spans are parsed in this process.
+                Each worker process creates its own parser with the same options once.
+            chunksize (int, optional): Number of distinct quantity spans sent to a worker process at once. 
+                Defaults to a quarter of the quantity spans per worker process.
+
+        Returns:
+            results (list[dict]): Results of parse() in the order of the quantity spans. Repeated quantity spans get separate copies of the result.
+        """
+        quantity_span_agglomerates = list(quantity_span_agglomerates)
+        unique_quantity_span_agglomerates = list(dict.fromkeys(quantity_span_agglomerates))
+
+        if workers <= 1 or len(unique_quantity_span_agglomerates) <= 1:
+            unique_results = [self.parse(quantity_span_agglomerate, simplify_results) for quantity_span_agglomerate in unique_quantity_span_agglomerates]
+        else:
+            if chunksize is None:
+                chunksize = max(1, len(unique_quantity_span_agglomerates) // (4 * workers))
+            
+            parser_options = {
+                "error_if_no_success": self.error_if_no_success, 
+                "allow_evaluating_str_as_python_expr": self.allow_evaluating_str_as_python_expr,
+                "verbose": self.verbose, 
+                "cache_size": self.parse_cache.maxsize,
+                "max_role_sets": self.max_role_sets,
+            }
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_quantity_parser_worker, initargs=(parser_options,)) as executor:
+                unique_results = list(executor.map(_parse_in_quantity_parser_worker, unique_quantity_span_agglomerates, itertools.repeat(simplify_results), chunksize=chunksize))
+
+        results_by_quantity_span = dict(zip(unique_quantity_span_agglomerates, unique_results))
+        results = []
+        is_returned = set()
+        for quantity_span_agglomerate in quantity_span_agglomerates:
+            result = results_by_quantity_span[quantity_span_agglomerate]
+            if quantity_span_agglomerate in is_returned:
+                # Prevent that modifying the result of one quantity span affects the results of its repetitions.
+                result = deepcopy(result)
+            else:
+                is_returned.add(quantity_span_agglomerate)
+            results.append(result)
+
+        return results
+
+
+    def _parse(self, quantity_span_agglomerate: str, simplify_results: bool=False) -> dict:
+        """Parses a quantity span without using the cache. See parse() for details."""
 
         ###########################################
         #      Normalize quantity span.           #
@@ -171,6 +277,7 @@ class FastSymbolicQuantityParser:
         failed_flag = False
         ellipsed = {}
         normalized_quantities = []                
+        normalization_cache = {}
         for i, quantity in enumerate(quantities[::-1]):
 
             if self.verbose and quantity == [] and len(quantities) > 0 and superstructure_type == "list":
@@ -189,9 +296,9 @@ class FastSymbolicQuantityParser:
                 if not formally_valid:
                     # Try sliding window parser instead.
                     quantity = all_quantities[0][i]
-                    normalized_quantity = self.sliding_window_parser(quantity)
+                    normalized_quantity = self.sliding_window_parser(quantity, normalization_cache)
             else:                
-                normalized_quantity = self.sliding_window_parser(quantity) 
+                normalized_quantity = self.sliding_window_parser(quantity, normalization_cache) 
             
 
             # If the center has no unit but the uncertainty expression has, move the unit from the uncertainty expression and to the center.
@@ -732,18 +839,27 @@ class FastSymbolicQuantityParser:
         return results
 
 
-    def sliding_window_parser(self, quantity_span_parts):
+    def sliding_window_parser(self, quantity_span_parts, normalization_cache: dict=None):
         """Parse and normalize quantity span parts using a sliding window approach, assuming that
         a quantity span consists of a prefixed modifier, prefixed unit, value, 
         suffixed unit, suffixed modifier in this order, where only the value is mandatory.
+
+        The parts are segmented greedily from left to right: Each part takes the longest window starting
+        at the end of the previous part that it can normalize. The normalization results are memoized 
+        per normalizer and window. Windows for modifiers and units are only extended as long as they 
+        can still be the beginning of a valid modifier or unit.
         
         Args:
             quantity_span_parts (list): List of quantity span parts, for example,
                 quantity_span_parts = ['about', ' ', '1.23', ' ', 'to', ' ', 'about', ' ', '1.24', ' ', 'million', ' ', 'euros']
+            normalization_cache (dict, optional): Memoized normalization results, which can be shared
+                between the quantities of a quantity span. If None, a new one is used.
 
         Returns:
             results (dict): Normalized quantity span parts.
         """
+        if normalization_cache is None:
+            normalization_cache = {}
 
         prefixed_modifier_normalizer = lambda x: self.normalize_modifier(x, is_prefixed=True)
         suffixed_modifier_normalizer = lambda x: self.normalize_modifier(x, is_prefixed=False)        
@@ -758,12 +874,38 @@ class FastSymbolicQuantityParser:
         uncertainty_normalizer = lambda x: self.normalize_uncertainty_expression(x, prefixed_unit_normalizer(None), suffixed_unit_normalizer(None))
         value_normalizer = lambda x: self.normalize_value(x)
 
+        # Feasibility checks for windows. If a window fails the check, all longer windows fail it as well.
+        # Modifiers must be the beginning of a known modifier. Units cannot contain decimal numbers, 
+        # neither can prefixed units, since these are skipped if they start with a magnitude word.
+        prefixed_modifier_is_feasible = lambda x: get_modifier_search_key(x) in self.PREFIXED_QUANTITY_MODIFIER_PREFIXES
+        suffixed_modifier_is_feasible = lambda x: get_modifier_search_key(x) in self.SUFFIXED_QUANTITY_MODIFIER_PREFIXES
+        unit_is_feasible = lambda x: not CONTAINS_DECIMAL_NUMBER_PATTERN.match(x)
+
+        def normalize(key, normalizer, text):
+            """Normalize text with memoization. The cached results are frozen, so that 
+            modifying the returned results does not change the cache."""
+            cache_key = (key, text)
+            cached_result = normalization_cache.get(cache_key, CACHE_MISS)
+            if cached_result is CACHE_MISS:
+                result = normalizer(text)
+                normalization_cache[cache_key] = freeze_result(result)
+                return result
+            else:
+                return thaw_result(cached_result)
+
         normalizers = [prefixed_modifier_normalizer, prefixed_unit_normalizer, value_normalizer, uncertainty_normalizer, suffixed_unit_normalizer, uncertainty_normalizer, suffixed_modifier_normalizer]
+        feasibility_checks = [prefixed_modifier_is_feasible, unit_is_feasible, None, None, unit_is_feasible, None, suffixed_modifier_is_feasible]
         keys = ["prefixed_modifier", "prefixed_unit", "value", "uncertainty_expression_pre_unit", "suffixed_unit", "uncertainty_expression_post_unit", "suffixed_modifier"]
+        # Both uncertainty expressions share their memoized results.
+        cache_keys = ["prefixed_modifier", "prefixed_unit", "value", "uncertainty_expression", "suffixed_unit", "uncertainty_expression", "suffixed_modifier"]
+
+        # Windows are slices of the quantity span between the character offsets of the parts.
+        quantity_span = "".join(quantity_span_parts)
+        part_offsets = list(itertools.accumulate((len(part) for part in quantity_span_parts), initial=0))
 
         max_valid_i = 0
         results = {}
-        for key, normalizer in zip(keys, normalizers):
+        for key, cache_key, normalizer, is_feasible in zip(keys, cache_keys, normalizers, feasibility_checks):
             max_valid_normalization = None
             offset = max_valid_i
             
@@ -772,12 +914,16 @@ class FastSymbolicQuantityParser:
                 offset += 1
 
             for i in range(offset + 1, len(quantity_span_parts) + 1):
-                window = quantity_span_parts[offset:i]
-                if window[-1] == " ":
+                if quantity_span_parts[i - 1] == " ":
                     # If the window ends with whitespace, we can skip it.
                     continue
                 else:
-                    result = normalizer("".join(window).strip())
+                    window = quantity_span[part_offsets[offset]:part_offsets[i]].strip()
+                    if is_feasible is not None and window != "" and not is_feasible(window):
+                        # Neither this nor any longer window can be normalized.
+                        break
+
+                    result = normalize(cache_key, normalizer, window)
                     if result["normalized"] != None:
                         
                         if key == "prefixed_unit" and result["forgotten_magnitude"] != "":
@@ -802,18 +948,18 @@ class FastSymbolicQuantityParser:
                     # Assume that the last part is a suffixed unit.
                     suffixed_unit_span = results["suffixed_unit"]["text"] if results["suffixed_unit"] != None else ""
                     suffixed_unit_span += "".join(quantity_span_parts[max_valid_i:])
-                    results["suffixed_unit"] = suffixed_unit_normalizer(suffixed_unit_span.strip())            
+                    results["suffixed_unit"] = normalize("suffixed_unit", suffixed_unit_normalizer, suffixed_unit_span.strip())            
                 elif results["suffixed_unit"] == None:
                     # Assume that the last part is a suffixed unit preceding a suffixed modifier.
                     # Without this special rule, quantities like 'two or more atoms' are not parsed correctly, 
                     # as the parser assumes the suffixed modifiers after the suffixed unit.
                     suffixed_unit_span = "".join(quantity_span_parts[max_valid_i:])
-                    results["suffixed_unit"] = suffixed_unit_normalizer(suffixed_unit_span.strip())      
+                    results["suffixed_unit"] = normalize("suffixed_unit", suffixed_unit_normalizer, suffixed_unit_span.strip())      
                 else:
                     # Assume that the last part is a suffixed modifier.
                     suffixed_modifier_span = results["suffixed_modifier"]["text"] 
                     suffixed_modifier_span += "".join(quantity_span_parts[max_valid_i:])
-                    results["suffixed_modifier"] = suffixed_modifier_normalizer(suffixed_modifier_span.strip())
+                    results["suffixed_modifier"] = normalize("suffixed_modifier", suffixed_modifier_normalizer, suffixed_modifier_span.strip())
 
         return results
     
@@ -913,6 +1059,8 @@ class FastSymbolicQuantityParser:
 
         Returns:
             role_set_permutation (list): List of role candidates for each token of the quantity span.
+                At most max_role_sets role sets are returned in the order of itertools.product(). If there are more,
+                the ones in which the fewest tokens deviate from their first role candidate are returned.
         
         """
 
@@ -1029,26 +1177,23 @@ class FastSymbolicQuantityParser:
         
             roles.append(part_roles)
 
-        # Create permutations of all role options.    
-        role_set_permutation = list(itertools.product(*roles))
-
-        # Filter known invalid role combinations if more than one role set.
-        for role_set in role_set_permutation.copy():
-            if len(role_set_permutation) > 1:
-                # Check if any invalid subpattern is present in the role set.
-                invalid_subpatterns = [('range_separator', 'whitespace', 'range_separator')]               
-                for invalid_subpattern in invalid_subpatterns:
-                    if str(invalid_subpattern)[1:-1] in str(role_set):
-                        role_set_permutation.remove(role_set)
-                        break
+        # Enumerate the permutations of all role options without known invalid role combinations.
+        # The permutations are enumerated lazily, as their number grows exponentially with the number of ambiguous tokens.
+        if self.max_role_sets is None:
+            role_set_permutation = list(iter_valid_role_sets(roles, INVALID_ROLE_SUBPATTERN_MATCHER))
+        else:
+            role_set_permutation = list(itertools.islice(iter_valid_role_sets(roles, INVALID_ROLE_SUBPATTERN_MATCHER), self.max_role_sets + 1))
+            if len(role_set_permutation) > self.max_role_sets:
+                # Too many role sets. Keep the ones closest to the preferred roles of the tokens.
+                role_set_permutation = get_most_preferred_role_sets(roles, INVALID_ROLE_SUBPATTERN_MATCHER, self.max_role_sets)
+        if len(role_set_permutation) == 0 and all(len(part_roles) > 0 for part_roles in roles):
+            # Keep one role set if all are invalid, that is, the last one.
+            role_set_permutation = [tuple(part_roles[-1] for part_roles in roles)]
         
-        # Filter known according to known dominant role sets.
-        if any('ratio_separator' in r for r in role_set_permutation):
-            # Do not confuse ratios with units.
-            if role_set_permutation == [('number', 'ratio_separator', 'number'), ('number', 'unit', 'number')]:
-                role_set_permutation = [('number', 'ratio_separator', 'number')]
-            elif role_set_permutation == [('number', 'whitespace', 'ratio_separator', 'whitespace', 'number'), ('number', 'whitespace', 'unit', 'whitespace', 'number')]:
-                role_set_permutation = [('number', 'whitespace', 'ratio_separator', 'whitespace', 'number')]
+        # Filter according to known dominant role sets.
+        dominant_role_sets = DOMINANT_ROLE_SETS.get(tuple(role_set_permutation))
+        if dominant_role_sets is not None:
+            role_set_permutation = list(dominant_role_sets)
 
         return role_set_permutation
 
@@ -1331,6 +1476,126 @@ class FastSymbolicQuantityParser:
             return result
 
 
+def iter_valid_role_sets(roles: list[list[str]], invalid_subpattern_matcher: AhoCorasickAutomaton, max_deviations: int=None) -> Iterator[tuple[str]]:
+    """Lazily enumerate the role sets, that is, the elements of itertools.product(*roles) in the same order, 
+    without the role sets containing an invalid subpattern (i.e., a contiguous subsequence of roles).
+    
+    The role sets are built by depth-first search. A partial role set is discarded as soon as its roles end with
+    an invalid subpattern or deviate too often from the preferred roles, so that none of the role sets starting 
+    with it are enumerated. The invalid subpatterns are matched incrementally with an automaton, whose state 
+    is stored for each depth, so that each role is checked in constant time regardless of the number of subpatterns.
+
+    Args:
+        roles (list[list[str]]): Role candidates for each token, where the first one is the preferred role.
+        invalid_subpattern_matcher (AhoCorasickAutomaton): Automaton of the invalid subsequences of roles (e.g., INVALID_ROLE_SUBPATTERN_MATCHER).
+        max_deviations (int, optional): If given, only role sets with at most this many tokens that do 
+            not have their preferred role are enumerated.
+
+    Yields:
+        role_set (tuple[str]): A valid role set.
+    """
+    n = len(roles)
+    role_set = []
+    option_indices = [0] * (n + 1)
+    matcher_states = [0] * (n + 1)
+    deviations = 0
+    i = 0
+    while True:
+        if i == n:
+            yield tuple(role_set)
+            if n == 0:
+                return
+            # Backtrack to try the next option of the last token.
+            i -= 1
+            role_set.pop()
+            deviations -= option_indices[i] > 0
+            option_indices[i] += 1
+            continue
+
+        if option_indices[i] == len(roles[i]) or (max_deviations is not None and option_indices[i] > 0 and deviations == max_deviations):
+            # All (allowed) options of this token are exhausted.
+            if i == 0:
+                return
+            option_indices[i] = 0
+            i -= 1
+            role_set.pop()
+            deviations -= option_indices[i] > 0
+            option_indices[i] += 1
+            continue
+
+        role = roles[i][option_indices[i]]
+        matcher_state = invalid_subpattern_matcher.get_next_state(matcher_states[i], role)
+        if invalid_subpattern_matcher.is_match_state(matcher_state):
+            # Prune all role sets starting with this partial role set.
+            option_indices[i] += 1
+        else:
+            role_set.append(role)
+            deviations += option_indices[i] > 0
+            i += 1
+            matcher_states[i] = matcher_state
+
+
+def get_most_preferred_role_sets(roles: list[list[str]], invalid_subpattern_matcher: AhoCorasickAutomaton, max_role_sets: int) -> list[tuple[str]]:
+    """Get the valid role sets in which the fewest tokens do not have their preferred role (see iter_valid_role_sets()).
+
+    Args:
+        roles (list[list[str]]): Role candidates for each token, where the first one is the preferred role.
+        invalid_subpattern_matcher (AhoCorasickAutomaton): Automaton of the invalid subsequences of roles.
+        max_role_sets (int): Maximum number of role sets.
+
+    Returns:
+        role_sets (list[tuple[str]]): At most max_role_sets valid role sets in the order of itertools.product(*roles).
+    """
+    # Increase the number of allowed deviations until the budget is exceeded.
+    role_sets = []
+    for max_deviations in range(len(roles) + 1):
+        candidates = list(itertools.islice(iter_valid_role_sets(roles, invalid_subpattern_matcher, max_deviations), max_role_sets + 1))
+        if len(candidates) > max_role_sets:
+            break
+        role_sets = candidates
+    else:
+        return role_sets
+
+    # Fill up the remaining budget with role sets with one more deviation.
+    get_deviations = lambda role_set: sum(role != part_roles[0] for role, part_roles in zip(role_set, roles))
+    role_sets += [role_set for role_set in candidates if get_deviations(role_set) == max_deviations][:max_role_sets - len(role_sets)]
+    
+    # Restore the order of itertools.product().
+    role_sets.sort(key=lambda role_set: [part_roles.index(role) for role, part_roles in zip(role_set, roles)])
+
+    return role_sets
+
+
+def get_modifier_search_key(quantity_modifier_span: str) -> str:
+    """Get the form of a modifier span that is compared to the prefixes of known modifiers, that is,
+    lowercased without spaces. Since the lowercase form of 'Σ' depends on the following character,
+    the final sigma is replaced, so that the key of a window starts with the key of any shorter window."""
+    return quantity_modifier_span.lower().replace(" ", "").replace("ς", "σ")
+
+
+def get_modifier_prefixes(quantity_modifiers: Iterable[str]) -> set[str]:
+    """Get all prefixes of the search keys of the given modifiers (see get_modifier_search_key())."""
+    prefixes = set()
+    for quantity_modifier in quantity_modifiers:
+        key = get_modifier_search_key(quantity_modifier)
+        prefixes.update(key[:i] for i in range(1, len(key) + 1))
+
+    return prefixes
+
+
+# Parser of a worker process of FastSymbolicQuantityParser.parse_batch().
+_WORKER_QUANTITY_PARSER = None
+
+def _init_quantity_parser_worker(parser_options: dict):
+    """Create the parser of a worker process once."""
+    global _WORKER_QUANTITY_PARSER
+    _WORKER_QUANTITY_PARSER = FastSymbolicQuantityParser(**parser_options)
+
+
+def _parse_in_quantity_parser_worker(quantity_span_agglomerate: str, simplify_results: bool) -> dict:
+    return _WORKER_QUANTITY_PARSER.parse(quantity_span_agglomerate, simplify_results)
+
+
 def protect_quantity_parts_from_being_split(quantity_span_agglomerate: str) -> tuple[list[str], list[bool]]:
     """
     Pre-tokenize string at boundaries of quantity modifier phrases, imprecise quantities, number words 
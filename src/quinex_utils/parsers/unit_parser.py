@@ -1,11 +1,10 @@
-import os
-import json
-from decimal import *
+from fractions import Fraction
 import numpy as np
 from copy import deepcopy
 from datetime import datetime
 from collections import defaultdict
-from thefuzz import process
+from typing import Iterable
+from thefuzz import process, fuzz
 
 try:
     from types import NoneType
@@ -20,78 +19,193 @@ except ImportError:
 from quinex_utils.parsers.utils.patterns import (
     IS_COMPOUND_ALPHA_UNIT,
     CURRENCY_YEAR_PATTERN,
-    UNIT_TOKENIZATION_PATTERN,
     REMOVE_WHITESPACE_PATTERN,
-    DIMENSION_VECTOR_PATTERN,
 )
-from quinex_utils import CONFIG
-from quinex_utils.functions import str2num, normalize_unit_span, remove_exponent_from_ucum_code_of_single_unit
+from quinex_utils.parsers.utils.unit_lookups import get_unit_lookup_registry, resolve_unit_link, dimension_vector_to_key, process_for_string_matching, conversion_multiplier_power, AMBIGUOUS_UNIT, QUDT_QUANTITY_KIND_PREFIX
+from quinex_utils.parsers.utils.caching import LRUCache, CACHE_MISS, freeze_result, thaw_result
+from quinex_utils.parsers.utils.unit_profiles import get_unit_parser_profile
+from quinex_utils.parsers.utils.unit_tokenizer import tokenize_unit_string
+from quinex_utils.parsers.utils.currency_rates import load_currency_rate_table
+from quinex_utils.functions import str2num, normalize_unit_span, normalize_unit_group
 
 
+def _unit_sort_key(unit: tuple) -> tuple:
+    """Sort key for (symbol/label, exponent, URI, year) tuples that may contain None."""
+    symbol, exponent, uri, year = unit
+    return (uri or "", exponent, year if year is not None else -1, symbol or "")
 
-# TODO: Add C code wrapper.
-class FastSymbolicUnitParser:
-    """A fast and simple rule-based unit parser which links QUDT units to unit strings."""
 
-    def __init__(self, load_ucum_codes: bool=False, verbose: bool=False):
+def get_compound_unit_key(units: list[tuple]) -> tuple:
+    """Get a canonical key for a compound unit that is independent of the order and the 
+    spelling of its units (e.g., 'kg m s^-2', 'm kg/s^2', and 'kg*m/s²' have the same key).
 
-        self.verbose = verbose
+    Args:
+        units (list[tuple]): Units of the form (symbol/label, exponent, URI, year).
+
+    Returns:
+        compound_unit_key (tuple): Sorted tuple of (URI, exponent) pairs.
+    """
+    return tuple(sorted((uri, exponent) for _, exponent, uri, _ in units))
+
+
+def intersect_applicable_system_bitmasks(superordinate_applicable_system_bitmask: int, applicable_system_bitmask: int) -> int:
+    """Intersect the applicable systems of the preceding units of a compound unit with those of the next unit.
+    If the intersection so far is empty, it starts over with the next unit. Hence, the result depends on the 
+    order of the units (e.g., 'g/g BTU/lb' is applicable to the systems of BTU and lb only).
+
+    Args:
+        superordinate_applicable_system_bitmask (int): Applicable systems of the preceding units as bitmask.
+        applicable_system_bitmask (int): Applicable systems of the next unit as bitmask.
+
+    Returns:
+        superordinate_applicable_system_bitmask (int): Applicable systems including the next unit as bitmask.
+    """
+    if superordinate_applicable_system_bitmask == 0:
+        return applicable_system_bitmask
+    
+    return superordinate_applicable_system_bitmask & applicable_system_bitmask
+
+
+def join_ucum_code_parts_with_slash(ucum_code_parts: list[str]) -> str:
+    """Join UCUM code parts of a compound unit, where divisors start with "/" (e.g., ['erg', '/cm2', '/s']).
+    Consecutive divisors after the first part are enclosed in parentheses and joined with "." 
+    (e.g., 'erg/(cm2.s)') and all other parts are joined with ".".
+
+    Args:
+        ucum_code_parts (list[str]): UCUM codes of the units of a compound unit.
+
+    Returns:
+        ucum_code (str): UCUM code of the compound unit.
+    """
+    n = len(ucum_code_parts)
+    joined_parts = [ucum_code_parts[0]]
+    i = 1
+    while i < n:
+        part = ucum_code_parts[i]
+        if part[0] != "/":
+            joined_parts.append("." + part)
+            i += 1
+            continue
+
+        # Find the end of the group of consecutive divisors.
+        j = i + 1
+        while j < n and ucum_code_parts[j][0] == "/":
+            j += 1
+
+        if j - i > 1:
+            joined_parts.append("/(" + ".".join(divisor[1:] for divisor in ucum_code_parts[i:j]) + ")")
+        else:
+            joined_parts.append(part)
+        i = j
+
+    return "".join(joined_parts)
+
+
+class ConversionPlan:
+    """A compiled conversion from one compound unit to another. As unit and currency
+    conversion is linear, it is a single conversion factor and the resolved target unit."""
+
+    def __init__(self, factor: float, target_unit: tuple, reason: str=None):
+        """
+        Args:
+            factor (float) or None: Conversion factor. None if conversion is not possible.
+            target_unit (tuple) or None: Resolved target unit, that is, tuples of the form (symbol/label, exponent, URI, year).
+            reason (str, optional): Reason why conversion is not possible.
+        """
+        self.factor = factor
+        self.target_unit = target_unit
+        self.reason = reason
 
-        # Load symbol lookup.            
-        with open(os.path.join(CONFIG["static_resources_dir"], "unit_symbol_lookup.json"), 'r') as f:
-            self.unit_symbol_lookup = json.load(f)
 
-        # Load label lookup.
-        with open(os.path.join(CONFIG["static_resources_dir"], "unit_label_lookup.json"), 'r') as f:
-            self.unit_label_lookup = json.load(f)
+    @property
+    def is_possible(self) -> bool:
+        return self.factor is not None
 
-        # Load priority lookup for ambiguous units.
-        with open(os.path.join(CONFIG["static_resources_dir"], "ambiguous_unit_priorities_curated.json"), 'r') as f:
-            unit_priorities_ = json.load(f)
 
-        # Remove all units with None as priority as well as remaining empty dicts.
-        self.unit_priorities = {}
-        for unit_expr, prios in unit_priorities_.items():
-            remaining_after_curation = {unit: prio for unit, prio in prios.items() if prio is not None}
-            if len(remaining_after_curation) > 0:
-                self.unit_priorities[unit_expr] = remaining_after_curation
+    def apply(self, value):
+        """Converts a value or an array of values.
+
+        Returns:
+            converted_value (float) or None: Converted value. None if conversion is not possible.
+            conv_unit (list[tuple]) or None: Resolved target unit.
+        """
+        if not self.is_possible:
+            return None, None
         
-        del unit_priorities_
+        return value * self.factor, list(self.target_unit)
+
+
+# TODO: Add C code wrapper.
+class FastSymbolicUnitParser:
+    """A fast and simple rule-based unit parser which links QUDT units to unit strings."""
+
+    def __init__(self, load_ucum_codes: bool=False, verbose: bool=False, cache_size: int=4096, fuzzy_fallback: bool=False, fuzzy_fallback_min_score: float=0.8, profile=None):
 
-        # Load unit dimension and kind lookup.
-        with open(os.path.join(CONFIG["static_resources_dir"], "unit_dimensions_and_kinds.json"), 'r') as f:
-            self.unit_dimensions_and_kinds = json.load(f)
+        self.verbose = verbose
 
-        # Load ucum code lookup.
+        # If True, unit strings that cannot be parsed are linked to the most similar known surface form 
+        # if its similarity is at least fuzzy_fallback_min_score (e.g., 'kilowat hours' or 'Mwh').
+        self.fuzzy_fallback = fuzzy_fallback
+        self.fuzzy_fallback_min_score = fuzzy_fallback_min_score
+
+        # Optionally, only link to the units of a domain (e.g., 'energy_systems'), 
+        # see get_unit_parser_profile() for the supported types of profiles.
+        self.profile = get_unit_parser_profile(profile) if profile is not None else None
+
+        # Get symbol, label, priority, dimension, and conversion lookups from the
+        # registry that is shared by all parser instances in this process.
+        self.lookup_registry = get_unit_lookup_registry(verbose=verbose, profile=self.profile)
+        self.unit_symbol_lookup = self.lookup_registry.unit_symbol_lookup
+        self.unit_label_lookup = self.lookup_registry.unit_label_lookup
+        self.unit_priorities = self.lookup_registry.unit_priorities
+        self.unit_dimensions_and_kinds = self.lookup_registry.unit_dimensions_and_kinds
+        self.conversion_lookup = self.lookup_registry.conversion_lookup
+        self.conversion_lookup_by_dimension_key = self.lookup_registry.conversion_lookup_by_dimension_key
+        self.reverse_symbol_label_lookup = self.lookup_registry.reverse_symbol_label_lookup
+        self.unit_link_table = self.lookup_registry.unit_link_table
+        self.applicable_system_bitmasks = self.lookup_registry.applicable_system_bitmasks
+        self.processed_surface_form_index = self.lookup_registry.processed_surface_form_index
+
+        # Get ucum code lookup.
         if load_ucum_codes:
-            with open(os.path.join(CONFIG["static_resources_dir"], "ucum_codes.json"), 'r') as f:
-                self.ucum_code_lookup = json.load(f)
+            self.ucum_code_lookup = self.lookup_registry.get_ucum_code_lookup()
+            self.ucum_code_part_lookup = self.lookup_registry.get_ucum_code_part_lookup()
         else:
             self.ucum_code_lookup = None
-        
-        self.conversion_lookup = defaultdict(dict)
-        for uri, info in self.unit_dimensions_and_kinds.items():
-            if info['conversion_multiplier'] in self.conversion_lookup[info['dimension_vector']]:
-                self.conversion_lookup[info['dimension_vector']][info['conversion_multiplier']].append(uri)            
-            else:
-                self.conversion_lookup[info['dimension_vector']].update({info['conversion_multiplier']: [uri]})
-
-        self.reverse_symbol_label_lookup = defaultdict(list)
-        for symbol, uris in self.unit_symbol_lookup.items():
-            for uri in uris:
-                self.reverse_symbol_label_lookup[uri].append(symbol)        
-        for label, uris in self.unit_label_lookup.items():
-            for uri in uris:
-                self.reverse_symbol_label_lookup[uri].append(label)
+            self.ucum_code_part_lookup = None
         
         self.ERROR_LOG = defaultdict(list)
+
+        # Cache of parse results including None for unit strings that could not be parsed.
+        self.parse_cache = LRUCache(maxsize=cache_size)
+
+        # Cache of compiled conversion plans.
+        self.conversion_plan_cache = LRUCache(maxsize=cache_size)
+
+        # Cache of unit candidates for single-class aggregation of compound units.
+        self.single_class_candidate_cache = LRUCache(maxsize=cache_size)
+
+        # Cache of generated compound UCUM codes.
+        self.ucum_code_cache = LRUCache(maxsize=cache_size)
+
+        # Units that satisfy an expected quantity kind and dimension vector.
+        self._allowed_units_cache = {}
         
-        if Currency == None:
-            self.cc = None
-        else:
-            self.cc = Currency(ignore_cache=False, normalize_to="USD", aggregate_from="A")
+        # Currency converter is created on first use.
+        self._currency_converter = None
     
 
+    @property
+    def cc(self):
+        """Currency converter. Uses the offline currency rate table if available and cucopy otherwise."""
+        if self._currency_converter is None:
+            self._currency_converter = load_currency_rate_table()
+            if self._currency_converter is None and Currency is not None:
+                self._currency_converter = Currency(ignore_cache=False, normalize_to="USD", aggregate_from="A")
+
+        return self._currency_converter
+
+
     def get_exponent(self, unit_string_parts, min_i, max_i, exponent):
         """Gets the exponent of a unit string part 
         based on preceding and succeeding unit string parts.
@@ -125,77 +239,137 @@ class FastSymbolicUnitParser:
         return exponent, used_indices
 
 
-    def qudt_unit_linking(self, unit_string_part):
-        """Links a unit string part to a QUDT unit class. 
-        In case of ambiguity, the unit with the highest priority is returned.
+    def get_allowed_units(self, expected_kind: str=None, expected_dimension: str=None) -> frozenset:
         """
+        Get the QUDT unit classes of the expected quantity kind with the expected dimension vector.
 
-        symbol_matches = self.unit_symbol_lookup.get(unit_string_part, [])
-        label_matches = self.unit_label_lookup.get(unit_string_part.lower(), [])
+        Args:
+            expected_kind (str, optional): Name or URI of a QUDT quantity kind (e.g., 'Time' or 'http://qudt.org/vocab/quantitykind/Time').
+            expected_dimension (str, optional): QUDT dimension vector (e.g., 'A0E0L0I0M0H0T1D0').
 
-        # As the label lookup mostly includes singular units, 
-        # we also check for plural units if no match was found.
-        if len(label_matches) == 0 and unit_string_part.endswith("s"):
-             # Remove trailing 's' from unit string part.
-             label_matches = self.unit_label_lookup.get(unit_string_part.lower()[:-1], [])
+        Returns:
+            allowed_units (frozenset) or None: URIs of the QUDT unit classes or None if no constraint is given.
+        """
+        if expected_kind is None and expected_dimension is None:
+            return None
         
-        matches = set(symbol_matches + label_matches)
+        key = (expected_kind, expected_dimension)
+        allowed_units = self._allowed_units_cache.get(key)
+        if allowed_units is None:
+            allowed_units = frozenset(self.unit_dimensions_and_kinds)
+            if expected_kind is not None:
+                units_by_quantity_kind = self.lookup_registry.get_units_by_quantity_kind()
+                quantity_kind = expected_kind.removeprefix(QUDT_QUANTITY_KIND_PREFIX)
+                if quantity_kind not in units_by_quantity_kind:
+                    raise ValueError(f'Unknown quantity kind "{expected_kind}".')
+                allowed_units &= units_by_quantity_kind[quantity_kind]
+            if expected_dimension is not None:
+                allowed_units &= frozenset(uri for uris in self.conversion_lookup.get(expected_dimension, {}).values() for uri in uris)
+            self._allowed_units_cache[key] = allowed_units
+
+        return allowed_units
+
+
+    def qudt_unit_linking(self, unit_string_part, expected_kind: str=None, expected_dimension: str=None):
+        """Links a unit string part to a QUDT unit class. 
+        In case of ambiguity, the unit with the highest priority is returned.
+        If an expected quantity kind or dimension vector is given (see get_allowed_units()), 
+        other units are pruned before resolving the ambiguity.
+        """
 
-        if len(matches) == 0:   
-            # No match.             
-            qudt_unit_class = None
-        elif len(matches) == 1:
-            # One match.
-            qudt_unit_class = matches.pop()
+        allowed_units = self.get_allowed_units(expected_kind, expected_dimension)
+        if allowed_units is not None:
+            # Constrained surface forms are resolved among the allowed units only.
+            qudt_unit_class = resolve_unit_link(unit_string_part, self.unit_symbol_lookup, self.unit_label_lookup, self.unit_priorities, allowed_units)
         else:
-            # Get priorities for unit.
-            priorities = self.unit_priorities.get(unit_string_part, {})
-            if len(priorities) == 0:
-                priorities = self.unit_priorities.get(unit_string_part.lower(), {})
-                if len(priorities) == 0 and unit_string_part.endswith("s"):
-                    # Remove trailing 's' from unit string part.
-                    priorities = self.unit_priorities.get(unit_string_part[:-1], {})
-                    if len(priorities) == 0:
-                        priorities = self.unit_priorities.get(unit_string_part.lower()[:-1], {})
-
-            prios = []
-            for match in matches:
-                prio = priorities.get(match)
-                if prio is not None:
-                    prios.append(prio)
-
-            if len(prios) > 0:                
-                # Get unit with lowest value for prio.
-                min_prio = min(prios)
-                if prios.count(min_prio) != 1:
-                    qudt_unit_class = None
-                    if self.verbose:
-                        print('Warning: Multiple units with same priority found for unit "{}".'.format(unit_string_part))                    
-                else:
-                    # Get index of unit with lowest prio.
-                    min_prio_index = prios.index(min_prio)
-                    # Get unit with lowest prio.
-                    qudt_unit_class = list(matches)[min_prio_index]
-            else:
-                # Maybe a lowered unit label was matched that is actually a unit symbol and should be treated case-sensitive.
-                if unit_string_part.startswith('M'):
-                    # If unit starts with a capital 'M', remove units containing 'Milli' from matches.
-                    matches = [match for match in matches if "Milli" not in match]
-                elif unit_string_part.startswith('m') and unit_string_part[1].isupper():                    
-                    # If unit starts with a small 'm' and is not followed by a lowercase letter,
-                    # and there is only one QUDT unit with 'Milli' in its URI, take that one.
-                    matches = [match for match in matches if "Milli" in match]
-
-                if len(matches) == 1:
-                    qudt_unit_class = matches.pop()
-                else: # TODO: raised error for "/hr"
-                    qudt_unit_class = None
-                    if self.verbose:
-                        print('Warning: Number of priorities does not match number of matches for unit "{}".'.format(unit_string_part))                    
+            # Known surface forms are resolved with a single lookup.
+            qudt_unit_class = self.unit_link_table.get(unit_string_part, CACHE_MISS)
+            if qudt_unit_class is CACHE_MISS:
+                # Surface form is not in the table (e.g., a label with unusual capitalization).
+                qudt_unit_class = resolve_unit_link(unit_string_part, self.unit_symbol_lookup, self.unit_label_lookup, self.unit_priorities)
+
+        if qudt_unit_class == AMBIGUOUS_UNIT:
+            qudt_unit_class = None
+            if self.verbose:
+                print('Warning: Ambiguous unit "{}" cannot be disambiguated using the unit priorities.'.format(unit_string_part))
 
         return qudt_unit_class
     
 
+    def fuzzy_unit_linking(self, unit_string: str, min_score: float=0.8) -> tuple[str, float]:
+        """
+        Links a possibly misspelled unit string to the QUDT unit class of the most similar known 
+        surface form. Candidates are retrieved from a character trigram index of all surface forms 
+        (see NgramIndex) instead of computing the string distance to every surface form.
+        Candidates with the same similarity are ranked by their case-sensitive Levenshtein similarity.
+
+        Args:
+            unit_string (str): Unit string to link.
+            min_score (float, optional): Minimum trigram similarity between 0 and 1.
+
+        Returns:
+            fuzzy_match (tuple[str, float]) or None: URI of the QUDT unit class and the similarity 
+                or None if no surface form is similar enough.
+        """
+        ngram_index = self.lookup_registry.get_surface_form_ngram_index()
+        candidates = ngram_index.search(unit_string, min_score=min_score)
+        candidates.sort(key=lambda c: (-c[1], -fuzz.ratio(unit_string, c[0])))
+        for surface_form, score in candidates:
+            qudt_unit_class = self.qudt_unit_linking(surface_form)
+            if qudt_unit_class is not None:
+                return qudt_unit_class, score
+
+        return None
+
+
+    def find_unit_mentions(self, text: str) -> list[tuple]:
+        """
+        Finds mentions of known unit symbols and labels in running text in a single pass. 
+        Overlapping mentions are resolved by preferring the leftmost and then the longest one.
+        Note that short symbols that are also common words (e.g., 'a' or 'in') are found too.
+
+        Args:
+            text (str): Text to search in (e.g., a paragraph).
+
+        Returns:
+            unit_mentions (list): List of tuples of the form (start, end, surface_form, qudt_unit_class).
+
+        Examples:
+            >>> find_unit_mentions("The plant produces 5 TWh per year.")
+            [(21, 24, 'TWh', 'http://qudt.org/vocab/unit/TeraW-HR'), (25, 33, 'per year', 'http://qudt.org/vocab/unit/PER-YR')]
+        """
+        automaton = self.lookup_registry.get_unit_surface_form_automaton()
+
+        # Lowercase the text to find labels regardless of their capitalization, but keep 
+        # characters whose lowercase form has another length to preserve the positions.
+        lowercased_text = text.lower()
+        if len(lowercased_text) != len(text):
+            lowercased_text = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+        unit_mentions = []
+        for start, end, _ in automaton.iter_matches(lowercased_text):
+            # Only consider mentions at token boundaries. A number may directly precede a unit (e.g., '5kWh').
+            if start > 0 and text[start-1].isalpha() and text[start].isalnum():
+                continue
+            if end < len(text) and text[end-1].isalnum() and text[end].isalnum():
+                continue
+            
+            # Link the mention as written in the text.
+            surface_form = text[start:end]
+            qudt_unit_class = self.qudt_unit_linking(surface_form)
+            if qudt_unit_class is not None:
+                unit_mentions.append((start, end, surface_form, qudt_unit_class))
+
+        # Remove overlapping mentions.
+        unit_mentions.sort(key=lambda m: (m[0], -m[1]))
+        non_overlapping_unit_mentions = []
+        for unit_mention in unit_mentions:
+            if len(non_overlapping_unit_mentions) == 0 or unit_mention[0] >= non_overlapping_unit_mentions[-1][1]:
+                non_overlapping_unit_mentions.append(unit_mention)
+
+        return non_overlapping_unit_mentions
+
+
     def get_compound_unit_conversion_info(self, units, break_if_conversion_not_allowed=False):
         """
         Aggregates conversion information from compound unit parts.
@@ -209,55 +383,73 @@ class FastSymbolicUnitParser:
                multiplier of the compound unit is not effected (that is, default conv. multiplier is 1).
             c) For currencies and other units without defined applicable systems, 
                the applicable system of the compound unit is not effected.
+            d) If a unit has a dimension vector with non-integer components (e.g., Pa√m), 
+               the dimension vector of the compound unit is None and conversion is not allowed.
         """
 
-        if len(units) <= 1:
-            raise ValueError("At least two units are required to get compound unit conversion information.")
+        superordinate_dimension_vector, _, superordinate_conversion_multiplier, superordinate_applicable_system_bitmask, allow_conversion = self._aggregate_compound_unit_conversion_info(units, break_if_conversion_not_allowed)
+        superordinate_conversion_multiplier = float(superordinate_conversion_multiplier)
+        superordinate_applicable_system = self.lookup_registry.get_applicable_systems(superordinate_applicable_system_bitmask)
 
-        def dim_vector_str_to_num(dimension_vector_str):      
-            dimension_vector_matches = DIMENSION_VECTOR_PATTERN.match(dimension_vector_str)
-            dimension_vector_dict = dimension_vector_matches.groupdict()          
-            dimension_vector = np.array([int(d) for d in dimension_vector_dict.values()])
+        dimension_vector_to_str = lambda sodv: f"A{int(sodv[0])}E{int(sodv[1])}L{int(sodv[2])}I{int(sodv[3])}M{int(sodv[4])}H{int(sodv[5])}T{int(sodv[6])}D{int(sodv[7])}"
+        superordinate_dimension_vector_str = dimension_vector_to_str(superordinate_dimension_vector) if superordinate_dimension_vector is not None else None
 
-            return dimension_vector
+        return superordinate_dimension_vector, superordinate_dimension_vector_str, superordinate_conversion_multiplier, superordinate_applicable_system, allow_conversion
+
+
+    def _aggregate_compound_unit_conversion_info(self, units, break_if_conversion_not_allowed=False):
+        """
+        Aggregates conversion information from compound unit parts using the integer dimension matrix.
+        Same as get_compound_unit_conversion_info() but returns the superordinate dimension vector 
+        packed into an integer key (see dimension_vector_to_key()) instead of a string, the exact 
+        conversion multiplier as fraction (or float in case of non-integer exponents), and the 
+        applicable systems as bitmask (see UnitLookupRegistry.applicable_system_bitmasks).
+        If a unit has a dimension vector with non-integer components, the dimension vector and key
+        are None and conversion is not allowed.
+        """
+
+        if len(units) <= 1:
+            raise ValueError("At least two units are required to get compound unit conversion information.")
         
         allow_conversion = True    
-        superordinate_dimension_vector = np.zeros(8)
-        superordinate_conversion_multiplier = Decimal(1)
-        superordinate_applicable_system = set()
+        superordinate_conversion_multiplier = Fraction(1)
+        superordinate_applicable_system_bitmask = 0
+        has_integer_dimension_vectors = True
+        unit_ids = []
+        exponents = []
         for i, (_, exponent, qudt_unit_class, _) in enumerate(units):
-
-            conversion_info = self.unit_dimensions_and_kinds.get(qudt_unit_class)
                         
             # Get superordinate applicable system.
-            if len(conversion_info["applicable_system"]) == 0:
+            applicable_system_bitmask = self.applicable_system_bitmasks[qudt_unit_class]
+            if applicable_system_bitmask == 0:
                 # Convention here: If no applicable system is defined, the unit is applicable to all systems.
                 # However, this can lead to wrong unit conversions. Therefore, we set allow_conversion to False.
                 allow_conversion = False
                 pass
-            elif len(superordinate_applicable_system) == 0:
-                # Init applicable systems.
-                superordinate_applicable_system = set(conversion_info["applicable_system"])            
             else:
                 # Get intersection of previous and current applicable systems.
-                superordinate_applicable_system = superordinate_applicable_system & set(conversion_info["applicable_system"])
-
-            # Get dimension vector.
-            dimension_vector_str = conversion_info["dimension_vector"]            
-            dimension_vector = dim_vector_str_to_num(dimension_vector_str)
-            if sum(dimension_vector[0:7]) == 0 and dimension_vector[7] != 0:
-                # Conversion of dimensionless units can lead to wrong unit conversions. 
+                superordinate_applicable_system_bitmask = intersect_applicable_system_bitmasks(superordinate_applicable_system_bitmask, applicable_system_bitmask)
+
+            # Get row of dimension vector.
+            unit_id = self.lookup_registry.unit_ids[qudt_unit_class]
+            if not self.lookup_registry.has_dimension_vector[unit_id]:
+                # The dimension vector has non-integer components (e.g., 'A0E0L-0dot5I0M1H0T-2D0'),
+                # so the superordinate dimension vector is unknown and conversion is not possible.
+                has_integer_dimension_vectors = False
                 allow_conversion = False
-
-            dimension_vector = dimension_vector * exponent
-            superordinate_dimension_vector += dimension_vector
+            else:
+                unit_ids.append(unit_id)
+                exponents.append(exponent)
+                if self.lookup_registry.is_dimensionless[unit_id]:
+                    # Conversion of dimensionless units can lead to wrong unit conversions. 
+                    allow_conversion = False
             
             # Get conversion multiplier.
-            if conversion_info["conversion_multiplier"] is not None:
+            conversion_multiplier = self.lookup_registry.conversion_multipliers[qudt_unit_class]
+            if conversion_multiplier is not None:
                 # Treat currencies and other units without conversion multipier 
                 # in compound units according to common practice in QUDT.
-                conversion_multiplier = Decimal(conversion_info["conversion_multiplier"])
-                superordinate_conversion_multiplier *= conversion_multiplier**Decimal(exponent)
+                superordinate_conversion_multiplier *= conversion_multiplier_power(conversion_multiplier, exponent)
             else:
                 # Coversion of compound units involving units without conversion multiplier 
                 # may lead wrong unit conversions.
@@ -267,14 +459,20 @@ class FastSymbolicUnitParser:
                 # If conversion is not allowed, break the loop.
                 break
 
+        if not has_integer_dimension_vectors:
+            # Neither dimension vector nor dimension key are defined.
+            return None, None, superordinate_conversion_multiplier, superordinate_applicable_system_bitmask, allow_conversion
+
+        # Sum up the dimension vectors of the units weighted by their exponents.
+        superordinate_dimension_vector = np.zeros(8) + np.array(exponents) @ self.lookup_registry.dimension_matrix[unit_ids]
+
         if superordinate_dimension_vector[-1] != 0 and any(v != 0 for v in superordinate_dimension_vector[:-1]):
             # If the compound quantity is not dimensionless anymore, adapt the dimension vector accordingly.
             superordinate_dimension_vector[-1] = 0
 
-        dimension_vector_to_str = lambda sodv: f"A{int(sodv[0])}E{int(sodv[1])}L{int(sodv[2])}I{int(sodv[3])}M{int(sodv[4])}H{int(sodv[5])}T{int(sodv[6])}D{int(sodv[7])}"
-        superordinate_dimension_vector_str = dimension_vector_to_str(superordinate_dimension_vector)
+        superordinate_dimension_key = dimension_vector_to_key(superordinate_dimension_vector)
 
-        return superordinate_dimension_vector, superordinate_dimension_vector_str, float(superordinate_conversion_multiplier), superordinate_applicable_system, allow_conversion
+        return superordinate_dimension_vector, superordinate_dimension_key, superordinate_conversion_multiplier, superordinate_applicable_system_bitmask, allow_conversion
 
 
     def unit_conversion(self, value: float, from_compound_unit: str, to_compound_unit: str , from_default_year: int=None, to_default_year: int=None) -> float:
@@ -288,32 +486,6 @@ class FastSymbolicUnitParser:
         Returns:
             converted_value (float): Converted value.
         """
-        # TODO: Start with dimensional analysis?
-
-        current_year = datetime.now().year
-
-        if len(from_compound_unit) == 0 and len(to_compound_unit) == 0:
-            # No conversion needed.
-            return value, from_compound_unit
-        elif len(to_compound_unit) == 0:
-            # Conversion is not possible.
-            return None, None
-        
-        from_compound_unit_ = deepcopy(from_compound_unit)
-        for i, from_unit in enumerate(from_compound_unit_):
-            # TODO: Implement handling of cents properly.
-            # Hot fix to support conversion of compound units with "PLACEHOLDER_CENT" unit.
-            if from_unit[2] == "http://qudt.org/PLACEHOLDER_CENT":                
-                value = value / (100 ** from_unit[1])
-                if not any("/currency/" in unit[2] or "/CCY_" in unit[2] for unit in from_compound_unit):
-                    # If there is no other currency in the from_compound_unit, return conversion is not possible,
-                    # because we do not yet distinguish between cents in different currencies.
-                    return None, None
-                else:
-                    # Assume cent modifies the currency in the compound unit.
-                    from_compound_unit.pop(i)
-
-
         def compund_unit_to_str(compound_unit):            
             unit_str = ""
             for unit in compound_unit:
@@ -327,20 +499,111 @@ class FastSymbolicUnitParser:
 
             return unit_str
         
+        if len(from_compound_unit) == 0 and len(to_compound_unit) == 0:
+            # No conversion needed.
+            return value, from_compound_unit
+        
         if self.verbose:
             print("\nConvert units:")
-            print(f"From: {round(value, 10)} {compund_unit_to_str(from_compound_unit)}")                    
+            print(f"From: {round(value, 10)} {compund_unit_to_str(from_compound_unit)}")
+
+        conversion_plan = self.get_conversion_plan(from_compound_unit, to_compound_unit, from_default_year, to_default_year)
+        conv_value, conv_unit = conversion_plan.apply(value)
+
+        if self.verbose:
+            if conversion_plan.is_possible:
+                print(f"To:   {round(conv_value, 10)} {compund_unit_to_str(conv_unit)}")
+            else:
+                print(f"Conversion failed. {conversion_plan.reason}")
+
+        return conv_value, conv_unit
+
+
+    def get_conversion_plan(self, from_compound_unit: list[tuple], to_compound_unit: list[tuple], from_default_year: int=None, to_default_year: int=None) -> "ConversionPlan":
+        """Get the conversion plan for a pair of compound units from the cache or compile it.
+        The cache key is independent of the order of the units within the compound units.
+
+        Args:
+            from_compound_unit (list[tuple]): Source unit.
+            to_compound_unit (list[tuple]): Target unit.
+            from_default_year (int, optional): Year of currencies in the source unit without year.
+            to_default_year (int, optional): Year of currencies in the target unit without year.
+
+        Returns:
+            conversion_plan (ConversionPlan): The conversion plan.
+        """
+        # Symbols of the source units do not affect the conversion.
+        canonical_from_unit = tuple(sorted(((None, exponent, uri, year) for _, exponent, uri, year in from_compound_unit), key=_unit_sort_key))
+        to_unit_order = sorted(range(len(to_compound_unit)), key=lambda i: _unit_sort_key(tuple(to_compound_unit[i])))
+        canonical_to_unit = tuple(tuple(to_compound_unit[i]) for i in to_unit_order)
+        key = (canonical_from_unit, canonical_to_unit, from_default_year, to_default_year)
+
+        conversion_plan = self.conversion_plan_cache.get(key)
+        if conversion_plan is CACHE_MISS:
+            conversion_plan = self.compile_conversion_plan(canonical_from_unit, canonical_to_unit, from_default_year, to_default_year)
+            self.conversion_plan_cache.put(key, conversion_plan)
         
-        to_compound_unit_ = to_compound_unit.copy()
-        conv_value = value
-        conv_unit = []        
+        if conversion_plan.is_possible and to_unit_order != sorted(to_unit_order):
+            # Return the resolved target unit in the order of the given target unit.
+            target_unit = [None] * len(to_unit_order)
+            for canonical_index, i in enumerate(to_unit_order):
+                target_unit[i] = conversion_plan.target_unit[canonical_index]
+            conversion_plan = ConversionPlan(conversion_plan.factor, tuple(target_unit))
+
+        return conversion_plan
+
+
+    def compile_conversion_plan(self, from_compound_unit: list[tuple], to_compound_unit: list[tuple], from_default_year: int=None, to_default_year: int=None) -> "ConversionPlan":
+        """Resolves the conversion from one compound unit to another into a single conversion factor.
+        Each source unit is matched to a target unit with the same exponent it can be converted to.
+        The resolved target unit is in the order of the given target unit.
+
+        Args:
+            from_compound_unit (list[tuple]): Source unit.
+            to_compound_unit (list[tuple]): Target unit.
+            from_default_year (int, optional): Year of currencies in the source unit without year.
+            to_default_year (int, optional): Year of currencies in the target unit without year.
+
+        Returns:
+            conversion_plan (ConversionPlan): The conversion plan.
+        """
+        # TODO: Start with dimensional analysis?
+
+        current_year = datetime.now().year
+
+        if len(from_compound_unit) == 0 and len(to_compound_unit) == 0:
+            # No conversion needed.
+            return ConversionPlan(1.0, ())
+        elif len(to_compound_unit) == 0:
+            return ConversionPlan(None, None, reason="Target unit is empty.")
+        
+        conv_value = 1.0
+        if any(from_unit[2] == "http://qudt.org/PLACEHOLDER_CENT" for from_unit in from_compound_unit):
+            # TODO: Implement handling of cents properly.
+            # Hot fix to support conversion of compound units with "PLACEHOLDER_CENT" unit.
+            if not any("/currency/" in unit[2] or "/CCY_" in unit[2] for unit in from_compound_unit):
+                # If there is no other currency in the from_compound_unit, return conversion is not possible,
+                # because we do not yet distinguish between cents in different currencies.
+                return ConversionPlan(None, None, reason="Cents can only be converted together with their currency.")
+            
+            # Assume cent modifies the currency in the compound unit.
+            for from_unit in from_compound_unit:
+                if from_unit[2] == "http://qudt.org/PLACEHOLDER_CENT":
+                    conv_value = conv_value / (100 ** from_unit[1])
+
+            from_compound_unit = [from_unit for from_unit in from_compound_unit if from_unit[2] != "http://qudt.org/PLACEHOLDER_CENT"]
+        
+        remaining_to_indices = list(range(len(to_compound_unit)))
+        conv_unit = list(to_compound_unit)
         for from_unit in from_compound_unit:
                         
             _, from_exponent, from_qudt_unit_class, from_year = from_unit
             
             # Check if there is a unit in to_compound_unit, that, from_unit can be converted to. 
             success = False
-            for to_unit in to_compound_unit_:
+            for to_index in remaining_to_indices:
+
+                to_unit = to_compound_unit[to_index]
 
                 _, to_exponent, to_qudt_unit_class, to_year = to_unit
 
@@ -361,7 +624,7 @@ class FastSymbolicUnitParser:
                         #                        Conversion of currencies                        #
                         ##########################################################################
                         if self.cc == None:
-                            raise ImportError("cucopy is not installed. Currency conversion is not available.")
+                            raise ImportError("cucopy is not installed and no currency rate table is available. Currency conversion is not available.")
                         
                         currency_conversion = True
                         if None in [from_year, to_year] and None in [from_default_year, to_default_year]:
@@ -439,32 +702,74 @@ class FastSymbolicUnitParser:
                     break
 
             if success:
-                # Remove to_unit from to_compound_unit_.
-                conv_unit.append((to_unit[0], to_unit[1], to_unit[2], to_y if currency_conversion else to_unit[3]))
-                to_compound_unit_.remove(to_unit)
+                # Remove to_unit from the remaining target units.
+                conv_unit[to_index] = (to_unit[0], to_unit[1], to_unit[2], to_y if currency_conversion else to_unit[3])
+                remaining_to_indices.remove(to_index)
             else:
                 # Conversion was not successful.
-                break
+                return ConversionPlan(None, None, reason=f"Source unit {from_qudt_unit_class} cannot be converted to any of the remaining target units.")
 
-        if len(to_compound_unit_) == 0:
+        if len(remaining_to_indices) == 0:
             # Conversion was successful.
-            if self.verbose:
-                print(f"To:   {round(conv_value, 10)} {compund_unit_to_str(conv_unit)}")
-            return conv_value, conv_unit
+            return ConversionPlan(conv_value, tuple(conv_unit))
         else:
             # Conversion was not successful.
-            if self.verbose:
-                print("Conversion failed.")
-            return None, None
+            return ConversionPlan(None, None, reason=f"No source unit is left to convert to {[to_compound_unit[i][2] for i in remaining_to_indices]}.")
+
+
+    def unit_conversion_array(self, values: np.ndarray, from_compound_unit: list[tuple], to_compound_unit: list[tuple], from_default_year: int=None, to_default_year: int=None, from_compound_units: list[list[tuple]]=None) -> tuple:
+        """Converts an array of values from one unit to another unit. As unit conversion is linear,
+        the conversion is resolved only once per source unit and applied to all its values at once.
+
+        Args:
+            values (np.ndarray): 1-D array of values to convert.
+            from_compound_unit (list[tuple]): Source unit of all values. Ignored if from_compound_units is given.
+            to_compound_unit (list[tuple]): Target unit.
+            from_default_year (int, optional): Year of currencies in the source unit without year.
+            to_default_year (int, optional): Year of currencies in the target unit without year.
+            from_compound_units (list[list[tuple]], optional): Source unit of each value for columns with mixed units.
+
+        Returns:
+            converted_values (np.ndarray) or None: Converted values. For mixed units, values that cannot be converted are NaN.
+            conv_unit (list[tuple]) or None: Resolved target unit.
+        """
+        values = np.asarray(values, dtype=float)
+
+        if from_compound_units is None:
+            return self.get_conversion_plan(from_compound_unit, to_compound_unit, from_default_year, to_default_year).apply(values)
+
+        if len(from_compound_units) != len(values):
+            raise ValueError(f"Number of source units ({len(from_compound_units)}) does not match number of values ({len(values)}).")
+        
+        # Group values by source unit.
+        value_indices_by_unit = defaultdict(list)
+        for i, from_unit in enumerate(from_compound_units):
+            value_indices_by_unit[tuple(tuple(unit) for unit in from_unit)].append(i)
+        
+        converted_values = np.full(values.shape, np.nan)
+        resolved_unit = None
+        for from_unit, value_indices in value_indices_by_unit.items():
+            conversion_plan = self.get_conversion_plan(from_unit, to_compound_unit, from_default_year, to_default_year)
+            if not conversion_plan.is_possible:
+                # Conversion is not possible for this source unit.
+                continue
+            
+            converted_values[value_indices] = values[value_indices] * conversion_plan.factor
+            if resolved_unit is None:
+                resolved_unit = list(conversion_plan.target_unit)
 
+        return converted_values, resolved_unit
 
-    def get_single_class_for_compound_unit(self, units: list[tuple], unit_string: str) -> str:             
+
+    def get_single_class_for_compound_unit(self, units: list[tuple], unit_string: str, allowed_units: frozenset=None) -> str:             
         """
         Attempts to find a single QUDT unit class that is equivalent to the given individual compound unit parts
         using dimensional analysis (https://en.wikipedia.org/wiki/Dimensional_analysis).
 
         Args:
             units (list): List of tuples of the form (unit_string_part, exponent, qudt_unit_class, used_indices).
+            unit_string (str): Normalized unit string used to choose between multiple candidates.
+            allowed_units (frozenset, optional): If given, candidates that are not allowed are pruned (see get_allowed_units()).
         
         Returns:
             qudt_unit_class (str) or None: URI of a QUDT unit class. If no matching unit is found, None is returned.
@@ -483,40 +788,98 @@ class FastSymbolicUnitParser:
             # Currently, for example, cent/kWh and EUR/kWh would be considered equivalent, but they are not.
             return unit
 
-        sodv, dimension_vector_str, superordinate_conversion_multiplier, superordinate_applicable_system, allow_unit_conversion = self.get_compound_unit_conversion_info(units, break_if_conversion_not_allowed=True)
-        if allow_unit_conversion:
-            # Unit conversion is theoretically possible.            
-            unit_candidates = self.conversion_lookup.get(dimension_vector_str,{}).get(superordinate_conversion_multiplier)
+        # Spelling variants of the same compound unit share the dimensional analysis.
+        compound_unit_key = get_compound_unit_key(units)
+        valid_unit_candidates = self.single_class_candidate_cache.get(compound_unit_key)
+        if valid_unit_candidates is CACHE_MISS:
+            valid_unit_candidates = self.get_single_class_candidates(compound_unit_key)
+            self.single_class_candidate_cache.put(compound_unit_key, valid_unit_candidates)
+
+        # Check if both the unit candidate and target unit are applicable to the same system. The applicable 
+        # systems depend on the order of the units (see intersect_applicable_system_bitmasks()) and are not cached.
+        if len(valid_unit_candidates) > 0:
+            superordinate_applicable_system_bitmask = 0
+            for _, _, qudt_unit_class, _ in units:
+                applicable_system_bitmask = self.applicable_system_bitmasks[qudt_unit_class]
+                if applicable_system_bitmask != 0:
+                    superordinate_applicable_system_bitmask = intersect_applicable_system_bitmasks(superordinate_applicable_system_bitmask, applicable_system_bitmask)
+
+            valid_unit_candidates = tuple(c for c in valid_unit_candidates if superordinate_applicable_system_bitmask & self.applicable_system_bitmasks[c])
+
+        if allowed_units is not None:
+            valid_unit_candidates = tuple(c for c in valid_unit_candidates if c in allowed_units)
+
+        if len(valid_unit_candidates) == 1:
+            # Exactly one match.
+            unit = valid_unit_candidates[0]
+        elif len(valid_unit_candidates) > 1:
+            # Multiple matches. Choose one based on string similarity. A candidate with a surface form 
+            # that equals the unit string after normalization has the highest possible similarity. 
+            processed_unit_string = process_for_string_matching(unit_string.replace(" ",""), is_query=True)
+            exact_matches = self.processed_surface_form_index.get(processed_unit_string, ())
+            unit = next((c for c in valid_unit_candidates if c in exact_matches), None)
+            if unit is not None:
+                return unit
             
-            if unit_candidates is not None:                
-                # Check if both the unit candidate and target unit are applicable to the same system.
-                valid_unit_candidates = []
-                for unit_candidate in unit_candidates:
-                    # Get intesection of applicable systems.
-                    applicable_systems = superordinate_applicable_system & set(self.unit_dimensions_and_kinds[unit_candidate]["applicable_system"])
-                    if len(applicable_systems) > 0:
-                        # Unit conversion is possible.
-                        valid_unit_candidates.append(unit_candidate)
-
-                if len(valid_unit_candidates) == 1:
-                    # Exactly one match.
-                    unit = valid_unit_candidates[0]
-                elif len(valid_unit_candidates) > 1:
-                    # Multiple matches. Choose one based on string similarity.
-                    similarity_scores = []
-                    for valid_unit_candidate in valid_unit_candidates:
-                        # Get lowest Levenshtein distance between unit string and surface forms.
-                        surface_forms = self.reverse_symbol_label_lookup.get(valid_unit_candidate)
-                        _, similarity_score = process.extractOne(unit_string.replace(" ",""), surface_forms)
-                        similarity_scores.append(similarity_score)
-
-                    # Choose unit with highest similartiy score. In case of a tie, choose the first one.
-                    unit = valid_unit_candidates[np.argmax(similarity_scores)]
+            # Otherwise, fall back to fuzzy string matching.
+            similarity_scores = []
+            for valid_unit_candidate in valid_unit_candidates:
+                # Get lowest Levenshtein distance between unit string and surface forms.
+                surface_forms = self.reverse_symbol_label_lookup.get(valid_unit_candidate)
+                _, similarity_score = process.extractOne(unit_string.replace(" ",""), surface_forms)
+                similarity_scores.append(similarity_score)
+
+            # Choose unit with highest similartiy score. In case of a tie, choose the first one.
+            unit = valid_unit_candidates[np.argmax(similarity_scores)]
                                     
         return unit
 
 
-    def parse(self, unit_string: str, group_exponent: int=1, quantity_normalization_already_done: bool=False) -> list[tuple]:
+    def get_single_class_candidates(self, compound_unit_key: tuple) -> tuple:
+        """
+        Get the QUDT unit classes with the same dimension vector and conversion multiplier as a compound unit.
+        The result only depends on the canonical key of the compound unit, which is why the units are aggregated 
+        in the order of the key. The candidates are not yet checked for shared applicable systems, because 
+        they depend on the order of the units (see intersect_applicable_system_bitmasks()).
+
+        Args:
+            compound_unit_key (tuple): Canonical key of the compound unit (see get_compound_unit_key()).
+
+        Returns:
+            unit_candidates (tuple): URIs of the unit candidates.
+        """
+        units = [(None, exponent, uri, None) for uri, exponent in compound_unit_key]
+        sodv, dimension_key, _, _, allow_unit_conversion = self._aggregate_compound_unit_conversion_info(units, break_if_conversion_not_allowed=True)
+        if not allow_unit_conversion:
+            return ()
+
+        # Unit conversion is theoretically possible.            
+        # Conversion multipliers must match exactly. Therefore, the multiplier is computed exactly from the 
+        # multipliers as stored (i.e., as floats) and rounded once. Using the exact decimal multipliers instead 
+        # would also match units whose prefixes only cancel out in decimal (e.g., 'dm3.s-1 per g/m3' and BQ-PER-KiloGM).
+        superordinate_conversion_multiplier = Fraction(1)
+        for uri, exponent in compound_unit_key:
+            superordinate_conversion_multiplier *= conversion_multiplier_power(Fraction(self.unit_dimensions_and_kinds[uri]["conversion_multiplier"]), exponent)
+
+        try:
+            superordinate_conversion_multiplier = float(superordinate_conversion_multiplier)
+        except OverflowError:
+            return ()
+        
+        return tuple(self.conversion_lookup_by_dimension_key.get(dimension_key, {}).get(superordinate_conversion_multiplier, ()))
+
+
+    def cache_info(self) -> dict:
+        """Get hit, miss, and eviction counters as well as the size of the parse cache."""
+        return self.parse_cache.info()
+
+
+    def clear_cache(self):
+        """Remove all cached parse results and reset the counters."""
+        self.parse_cache.clear()
+
+
+    def parse(self, unit_string: str, group_exponent: int=1, quantity_normalization_already_done: bool=False, expected_kind: str=None, expected_dimension: str=None) -> list[tuple]:
         """
         Parses a unit string into a list of tuples of the form (unit_string_part, exponent, qudt_unit_class, used_indices).
         The aim is not to divide the units into their smallest parts but to return as little compund unit parts as possible, 
@@ -526,9 +889,13 @@ class FastSymbolicUnitParser:
             unit_string (str): Unit string to parse.
             group_exponent (int, optional): Exponent of the group. Defaults to 1. Used for recursive calls.
             quantity_normalization_already_done (bool, optional): If True, the standard normalization procedure for quantities is skipped to save time.
+            expected_kind (str, optional): Expected QUDT quantity kind of the unit (e.g., 'Time'). Units of other kinds are pruned 
+                when linking the whole unit string or aggregating a compound unit to a single class (see get_allowed_units()).
+            expected_dimension (str, optional): Expected QUDT dimension vector of the unit (e.g., 'A0E0L0I0M0H0T1D0'). Same as expected_kind.
 
         Returns:
             units (list): List of tuples of the form (unit_string_part, exponent, qudt_unit_class, used_indices).
+                If the unit string is linked to a single unit that does not satisfy the constraints, None is returned.
     
         Examples:
             >>> parse("%")    
@@ -539,9 +906,42 @@ class FastSymbolicUnitParser:
             [('$', 1, 'http://qudt.org/vocab/unit/CCY_USD', 2021), ('kWh', -1, 'http://qudt.org/vocab/unit/KiloW-HR', None)]
             >>> parse("km / s")           
             [('km / s', 1, 'http://qudt.org/vocab/unit/KiloM-PER-SEC', None)]
+            >>> parse("a", expected_kind="Area")
+            [('a', 1, 'http://qudt.org/vocab/unit/ARE', None)]
+
+        """
+
+        key = (unit_string, group_exponent, quantity_normalization_already_done, expected_kind, expected_dimension)
+        cached_units = self.parse_cache.get(key)
+        if cached_units is CACHE_MISS:
+            units = self._parse(unit_string, group_exponent, quantity_normalization_already_done, expected_kind=expected_kind, expected_dimension=expected_dimension)
+            # Store an immutable copy to prevent callers from corrupting the cache.
+            cached_units = tuple(units) if units is not None else None
+            self.parse_cache.put(key, cached_units)
 
+        return list(cached_units) if cached_units is not None else None
+
+
+    def _parse(self, unit_string: str, group_exponent: int=1, quantity_normalization_already_done: bool=False, is_unit_group: bool=False, expected_kind: str=None, expected_dimension: str=None) -> list[tuple]:
+        """Parses a unit string without using the cache. See parse() for details.
+
+        If is_unit_group is True, the unit string is the content of a parenthesized group 
+        of an already normalized unit string and is therefore not normalized again.
         """
+        allowed_units = self.get_allowed_units(expected_kind, expected_dimension)
+        units = self._parse_unit_string(unit_string, group_exponent, quantity_normalization_already_done, is_unit_group, expected_kind, expected_dimension)
+
+        if allowed_units is not None and units is not None and len(units) == 1 and units[0][1] == 1 and units[0][2] not in allowed_units:
+            # Unit does not satisfy the constraints.
+            return None
+        
+        return units
 
+
+    def _parse_unit_string(self, unit_string: str, group_exponent: int, quantity_normalization_already_done: bool, is_unit_group: bool, expected_kind: str, expected_dimension: str) -> list[tuple]:
+        """Links or decomposes a unit string. The expected quantity kind and dimension only constrain 
+        linking the whole unit string, whereas the parts of compound units are linked without constraints.
+        """
         # Assumption: Each unit of a compound unit is part of the QUDT including the unit prefix. 
         # This assumptions allows us to not deal with unit prefixes (e.g. 'k' for kilo) separately.
         # Assumption: All unit labels are lowercase.
@@ -551,7 +951,7 @@ class FastSymbolicUnitParser:
             return None
         
         # First, try direct match.        
-        qudt_unit_class = self.qudt_unit_linking(unit_string)
+        qudt_unit_class = self.qudt_unit_linking(unit_string, expected_kind, expected_dimension)
         if qudt_unit_class is not None:
             ###########################################
             #            Got direct match.            #
@@ -569,7 +969,10 @@ class FastSymbolicUnitParser:
         #           Normalize unit span.          #
         ###########################################
         # Try direct match with different postprocessed forms of the unit string.
-        normalized_unit_string, display_unit_str = normalize_unit_span(unit_string, quantity_normalization_already_done=quantity_normalization_already_done)
+        if is_unit_group:
+            normalized_unit_string, display_unit_str = normalize_unit_group(unit_string)
+        else:
+            normalized_unit_string, display_unit_str = normalize_unit_span(unit_string, quantity_normalization_already_done=quantity_normalization_already_done)
         normalized_unit_string_wo_parentheses = normalized_unit_string.removeprefix('(').removesuffix(')')
         postprocessed_forms = [normalized_unit_string, normalized_unit_string_wo_parentheses]
         if IS_COMPOUND_ALPHA_UNIT.fullmatch(normalized_unit_string_wo_parentheses):
@@ -577,7 +980,7 @@ class FastSymbolicUnitParser:
 
         for postprocessed_form in set(postprocessed_forms):
             if postprocessed_form != unit_string:
-                qudt_unit_class = self.qudt_unit_linking(postprocessed_form)
+                qudt_unit_class = self.qudt_unit_linking(postprocessed_form, expected_kind, expected_dimension)
                 if qudt_unit_class is not None:
                     ###########################################
                     #            Got direct match.            #
@@ -588,7 +991,7 @@ class FastSymbolicUnitParser:
         #        Decompose compound unit.         #
         ###########################################
         # No match. Try to decompose compound unit.
-        units = self.parse_compound_unit_str(normalized_unit_string, group_exponent=group_exponent)
+        units = self.parse_compound_unit_str(normalized_unit_string, group_exponent=group_exponent, is_unit_group=is_unit_group)
                   
         if units != None:
             if len(units) == 1:
@@ -598,7 +1001,7 @@ class FastSymbolicUnitParser:
                 ########################################################
                 #    Aggregate compund unit back to a single class.    #
                 ########################################################   
-                unit = self.get_single_class_for_compound_unit(units, normalized_unit_string)
+                unit = self.get_single_class_for_compound_unit(units, normalized_unit_string, self.get_allowed_units(expected_kind, expected_dimension))
                 if unit is not None:
                     units = [(display_unit_str, 1, unit, None)]
             
@@ -607,17 +1010,22 @@ class FastSymbolicUnitParser:
             # Last fallback: Remove all whitespace and check again.
             # Note that this can lead to false positives (e.g., "m s -1" -> "ms-1").
             normalized_unit_string_wo_parentheses_and_whitespace = REMOVE_WHITESPACE_PATTERN.sub('', normalized_unit_string_wo_parentheses)
-            qudt_unit_class = self.qudt_unit_linking(normalized_unit_string_wo_parentheses_and_whitespace)
+            qudt_unit_class = self.qudt_unit_linking(normalized_unit_string_wo_parentheses_and_whitespace, expected_kind, expected_dimension)
             if qudt_unit_class is not None:
                 ###########################################
                 #            Got direct match.            #
                 ###########################################
                 return [(display_unit_str, group_exponent, qudt_unit_class, None)]
-            else:
-                return None
+            elif self.fuzzy_fallback:
+                # Optional fallback: Link to the most similar known surface form.
+                fuzzy_match = self.fuzzy_unit_linking(display_unit_str, min_score=self.fuzzy_fallback_min_score)
+                if fuzzy_match is not None:
+                    return [(display_unit_str, group_exponent, fuzzy_match[0], None)]
+            
+            return None
 
 
-    def parse_compound_unit_str(self, normalized_unit_string: str, group_exponent: int=1) -> list[tuple]:
+    def parse_compound_unit_str(self, normalized_unit_string: str, group_exponent: int=1, is_unit_group: bool=False) -> list[tuple]:
         """
         Decopmpose a compound unit string into its individual parts and parse 
         each part individually whilst keeping track of the exponents.
@@ -626,25 +1034,27 @@ class FastSymbolicUnitParser:
         # Splits a unit string at whitespace, '/', "*", "^", and 4-digit numbers (optionally 
         # within curly braces and preceded by an underscore), which are likely to be years,  
         # but keep strings inside parantheses intact.
-        unit_string_parts = UNIT_TOKENIZATION_PATTERN.split(normalized_unit_string)
-        
-        # Remove empty strings from list.
-        unit_string_parts = [part for part in unit_string_parts if part not in ['', ' ']]
+        unit_string_parts = tokenize_unit_string(normalized_unit_string)
 
         # Loop through the individual parts of the unit string.
         units = []
-        all_used_indices = []
+        all_used_indices = set()
         for i, unit_string_part in enumerate(unit_string_parts):
 
             if i in all_used_indices:
                 # Unit string part has already been used.
                 continue
             elif unit_string_part[0] == '(' and unit_string_part[-1] == ')':             
-                # Deal with nested parantheses.
-                group_exponent, used_indices = self.get_exponent(unit_string_parts, i, i, group_exponent)
-                unit_group = self.parse(unit_string_part[1:-1], group_exponent=group_exponent)
-                if unit_group is not None:                        
-                    units += unit_group                
+                # Deal with nested parantheses. The group is parsed as a subtree with the 
+                # exponent of the group pushed down to its units. It is already normalized.
+                subgroup_exponent, used_indices = self.get_exponent(unit_string_parts, i, i, group_exponent)
+                unit_group = self._parse(unit_string_part[1:-1], group_exponent=subgroup_exponent, is_unit_group=True)
+                if unit_group is not None:
+                    units += unit_group
+                elif is_unit_group or "(" in unit_string_part[1:-1]:
+                    # Only unit groups without nested groups at the root can be annotations 
+                    # (e.g., '% (HHV)'). Otherwise, the unit string cannot be parsed.
+                    return None
             else:
 
                 # Try to match unit string part to QUDT class.
@@ -671,15 +1081,15 @@ class FastSymbolicUnitParser:
                     # to determine the exponent of the next unit.
                     continue
 
-            all_used_indices += used_indices
-
             # Early abort condition: Check if no part of the unit string has been used more than once.
-            if len(set(all_used_indices)) != len(all_used_indices):
-                # Unit string could not be parsed.
-                return None
+            for used_index in used_indices:
+                if used_index in all_used_indices:
+                    # Unit string could not be parsed.
+                    return None
+                all_used_indices.add(used_index)
 
         # Final check: Check if all parts of the unit string have been used exactly once.
-        if len(set(all_used_indices)) != len(unit_string_parts):
+        if len(all_used_indices) != len(unit_string_parts):
             # Unit string could not be parsed.
             return None
         
@@ -698,7 +1108,7 @@ class FastSymbolicUnitParser:
             No use of parantheses such as in "erg/(cm2.s)".        
 
         Args:
-            units (list[str, str]): List of units in the form of a tuple of (exponent, qudt_unit_uri).            
+            units (list[str, str]): List of units in the form of a tuple or list of (exponent, qudt_unit_uri).            
 
         Returns:
             ucum_codes (list[str]): List of compound UCUM codes.
@@ -707,6 +1117,20 @@ class FastSymbolicUnitParser:
         if self.ucum_code_lookup is None:
             raise ValueError("UCUM code lookup not loaded. Initialize FastSymbolicUnitParser class with load_ucum_codes=True.")
         
+        # Units can also be lists instead of tuples (e.g., after a JSON round trip).
+        key = tuple(map(tuple, units))
+        generated_ucum_codes = self.ucum_code_cache.get(key)
+        if generated_ucum_codes is CACHE_MISS:
+            generated_ucum_codes = freeze_result(self._generate_compound_ucum_codes(key))
+            self.ucum_code_cache.put(key, generated_ucum_codes)
+
+        # Return a copy, so that the cached result cannot be modified.
+        return thaw_result(generated_ucum_codes)
+
+
+    def _generate_compound_ucum_codes(self, units: tuple) -> list[str]:
+        """Get compound UCUM codes without using the cache. See get_compound_ucum_codes() for details."""
+
         if any(qudt_unit_uri.startswith("http://qudt.org/vocab/currency/") or qudt_unit_uri.startswith("http://qudt.org/vocab/unit/CCY_") for _, qudt_unit_uri in units):
             return [] 
 
@@ -716,15 +1140,15 @@ class FastSymbolicUnitParser:
             if exponent == 0:
                 raise ValueError("Exponent of 0 not allowed.")
 
-            ucum_codes = self.ucum_code_lookup.get(qudt_unit_uri, [])
+            # UCUM codes are already split into the code without exponent and the exponent.
+            ucum_codes = self.ucum_code_part_lookup.get(qudt_unit_uri, ())
             
             if len(ucum_codes) == 0:
                 raise ValueError(f"UCUM code for {qudt_unit_uri} not found.")                    
 
-            for ucum_code in ucum_codes:
+            for ucum_code, included_exponent in ucum_codes:
                 
                 # Get UCUM code variant.
-                ucum_code, included_exponent = remove_exponent_from_ucum_code_of_single_unit(ucum_code)
                 exponent *= included_exponent
 
                 if exponent != 1:
@@ -757,33 +1181,48 @@ class FastSymbolicUnitParser:
         if len(ucum_code_parts["-1"]) > 0:
             generated_ucum_codes["-1"] = ".".join(ucum_code_parts["-1"])
         
-        already_used_indices = []
         if len(ucum_code_parts["/"]) > 0:
-            # Enclose groups of ucum code parts starting with "/" in parantheses
-            # and only join parts with "." if they are not starting with "/".
-            generated_ucum_codes["/"] = ""            
-            for i, part in enumerate(ucum_code_parts["/"]):
-                if i == 0:
-                    generated_ucum_codes["/"] += part
-                elif i in already_used_indices:
-                    continue
-                elif part[0] == "/" and len(ucum_code_parts["/"]) > i + 1 and ucum_code_parts["/"][i+1][0] == "/":
-                    # Start group in parantheses.
-                    generated_ucum_codes["/"] += f'/({part[1:]}.{ucum_code_parts["/"][i+1][1:]}'
-                    already_used_indices.append(i+1)
-                    for j in range(i+2, len(ucum_code_parts["/"])):
-                        if ucum_code_parts["/"][j][0] == "/":
-                            already_used_indices.append(j)
-                            generated_ucum_codes["/"] += "." + ucum_code_parts["/"][j][1:]
-                        else:                            
-                            break
+            generated_ucum_codes["/"] = join_ucum_code_parts_with_slash(ucum_code_parts["/"])
 
-                    generated_ucum_codes["/"] += ")"
-                elif part[0] == "/":
-                    generated_ucum_codes["/"] += part
-                else:
-                    generated_ucum_codes["/"] += "." + part
+        return generated_ucum_codes
+
+
+    def get_compound_ucum_codes_bulk(self, parsed_units: Iterable[list[tuple]], skip_errors: bool=False) -> list:
+        """
+        Get compound UCUM codes for many parsed compound units (e.g., to export large tables to 
+        systems using UCUM). The UCUM codes are generated only once per distinct compound unit.
+
+        Args:
+            parsed_units (Iterable[list[tuple]]): Results of parse(), that is, lists of tuples of the 
+                form (unit_string_part, exponent, qudt_unit_class, used_indices) or None.
+            skip_errors (bool, optional): If True, None is returned for compound units without UCUM code
+                instead of raising a ValueError.
+
+        Returns:
+            ucum_codes (list): Results of get_compound_ucum_codes() in the order of the parsed units or None
+                for unparsed units. Each result is a separate object, also for equal compound units.
+        
+        Examples:
+            >>> get_compound_ucum_codes_bulk([parse("km/s"), parse("MW"), parse("km/s"), None])
+            [{'/': 'km.s-1', '-1': 'km.s-1'}, {'/': 'MW', '-1': 'MW'}, {'/': 'km.s-1', '-1': 'km.s-1'}, None]
+        """
+        generated_ucum_codes = {}
+        ucum_codes = []
+        for units in parsed_units:
+            if units is None:
+                ucum_codes.append(None)
+                continue
+
+            key = tuple((exponent, qudt_unit_uri) for _, exponent, qudt_unit_uri, _ in units)
+            if key not in generated_ucum_codes:
+                try:
+                    generated_ucum_codes[key] = freeze_result(self.get_compound_ucum_codes(key))
+                except ValueError:
+                    if not skip_errors or self.ucum_code_lookup is None:
+                        raise
+                    generated_ucum_codes[key] = None
 
-                already_used_indices.append(i)
+            # Copy the result, so that modifying it does not change the results of equal compound units.
+            ucum_codes.append(thaw_result(generated_ucum_codes[key]))
 
-        return generated_ucum_codes
\ No newline at end of file
+        return ucum_codes
\ No newline at end of file
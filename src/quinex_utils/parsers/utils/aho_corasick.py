@@ -0,0 +1,100 @@
+from collections import deque
+from typing import Iterable, Iterator
+
+
+class AhoCorasickAutomaton:
+    """Multi-pattern string matcher that finds all occurrences of many patterns in a text
+    in a single pass (see https://en.wikipedia.org/wiki/Aho%E2%80%93Corasick_algorithm).
+
+    The states of the trie are numbered. For each state, the automaton stores its transitions,
+    the state of the longest proper suffix that is also in the trie (failure link), the index
+    of the pattern ending in the state, and the next state reachable via failure links in which
+    a pattern ends (output link).
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Args:
+            patterns (Iterable[str]): Patterns to search for. Empty strings and duplicates are ignored.
+                Patterns can also be tuples of other hashable symbols (e.g., words) to search in sequences of these symbols.
+        """
+        self.patterns = []
+        self.transitions = [{}]
+        self.pattern_ids = [None]
+
+        # Build trie.
+        for pattern in patterns:
+            if len(pattern) == 0:
+                continue
+            state = 0
+            for c in pattern:
+                next_state = self.transitions[state].get(c)
+                if next_state is None:
+                    next_state = len(self.transitions)
+                    self.transitions[state][c] = next_state
+                    self.transitions.append({})
+                    self.pattern_ids.append(None)
+                state = next_state
+            if self.pattern_ids[state] is None:
+                self.pattern_ids[state] = len(self.patterns)
+                self.patterns.append(pattern)
+
+        # Add failure and output links in breadth-first order.
+        self.failure_links = [0] * len(self.transitions)
+        self.output_links = [None] * len(self.transitions)
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, next_state in self.transitions[state].items():
+                failure_state = self.failure_links[state]
+                while failure_state != 0 and c not in self.transitions[failure_state]:
+                    failure_state = self.failure_links[failure_state]
+                failure_state = self.transitions[failure_state].get(c, 0)
+                self.failure_links[next_state] = failure_state
+                if self.pattern_ids[failure_state] is not None:
+                    self.output_links[next_state] = failure_state
+                else:
+                    self.output_links[next_state] = self.output_links[failure_state]
+                queue.append(next_state)
+
+
+    def __len__(self):
+        return len(self.patterns)
+
+
+    def get_next_state(self, state: int, c) -> int:
+        """Get the state after reading the next character in the given state, 
+        which allows matching incrementally (0 is the initial state)."""
+        while state != 0 and c not in self.transitions[state]:
+            state = self.failure_links[state]
+        return self.transitions[state].get(c, 0)
+
+
+    def is_match_state(self, state: int) -> bool:
+        """Check whether any pattern ends in the given state."""
+        return self.pattern_ids[state] is not None or self.output_links[state] is not None
+
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int, str]]:
+        """Find all occurrences of the patterns in the text including overlapping ones.
+
+        Args:
+            text (str): Text to search in.
+
+        Yields:
+            match (tuple[int, int, str]): Start and end position of the occurrence and the matched pattern.
+                Matches are yielded in order of their end position and from longest to shortest.
+        """
+        transitions = self.transitions
+        failure_links = self.failure_links
+        state = 0
+        for end, c in enumerate(text, start=1):
+            while state != 0 and c not in transitions[state]:
+                state = failure_links[state]
+            state = transitions[state].get(c, 0)
+
+            match_state = state if self.pattern_ids[state] is not None else self.output_links[state]
+            while match_state is not None:
+                pattern = self.patterns[self.pattern_ids[match_state]]
+                yield end - len(pattern), end, pattern
+                match_state = self.output_links[match_state]
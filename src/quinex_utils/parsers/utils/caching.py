@@ -0,0 +1,112 @@
+from types import MappingProxyType
+from collections import OrderedDict
+
+
+# Marker to distinguish a cache miss from a cached None.
+CACHE_MISS = object()
+
+
+class LRUCache:
+    """A size-bounded least-recently-used cache with hit, miss, and eviction counters.
+
+    The cache does not copy the stored values. Callers should only store immutable values
+    (e.g., tuples of tuples) or copy them on retrieval.
+    """
+
+    def __init__(self, maxsize: int=4096):
+        """
+        Args:
+            maxsize (int, optional): Maximum number of cached entries. If 0, nothing is cached.
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize must be a non-negative integer.")
+
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def get(self, key, default=CACHE_MISS):
+        """Get the cached value for key or default if key is not cached."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+
+    def put(self, key, value):
+        """Cache value for key and evict the least recently used entry if the cache is full."""
+        if self.maxsize == 0:
+            return
+
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def info(self) -> dict:
+        """Get the cache statistics."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "currsize": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+class FrozenList(tuple):
+    """Immutable list. Distinguishes frozen lists from tuples, so that freezing is reversible."""
+
+
+def freeze_result(obj):
+    """Recursively convert a result of nested dicts, lists, and tuples into an immutable
+    structure, that is, dicts into read-only mapping proxies and lists into FrozenLists.
+    Other values are assumed to be immutable (e.g., strings, numbers, and None).
+    """
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze_result(v) for k, v in obj.items()})
+    elif isinstance(obj, list):
+        return FrozenList(freeze_result(v) for v in obj)
+    elif isinstance(obj, tuple):
+        return tuple(freeze_result(v) for v in obj)
+    else:
+        return obj
+
+
+def thaw_result(obj):
+    """Get a mutable copy of a result frozen with freeze_result()."""
+    if isinstance(obj, MappingProxyType):
+        return {k: thaw_result(v) for k, v in obj.items()}
+    elif isinstance(obj, FrozenList):
+        return [thaw_result(v) for v in obj]
+    elif isinstance(obj, tuple):
+        return tuple(thaw_result(v) for v in obj)
+    else:
+        return obj
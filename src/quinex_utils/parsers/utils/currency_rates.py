@@ -0,0 +1,195 @@
+import json
+import numpy as np
+from pathlib import Path
+from datetime import datetime
+from quinex_utils import CONFIG
+
+try:
+    from cucopy import Currency
+except ImportError:
+    Currency = None
+
+
+CURRENCY_RATE_TABLE_FILE = "currency_rates.json"
+
+
+class CurrencyRateTable:
+    """Yearly consumer price indices and exchange rates for adjusting currencies
+    for inflation and converting them offline.
+
+    Conversions follow cucopy's Currency.convert_currency(), from which the table is
+    created (see create_currency_rate_table()), so it can be used as a drop-in replacement.
+    """
+
+    def __init__(self, cpi: dict, exchange_rates: dict, normalize_to: str="USD"):
+        """
+        Args:
+            cpi (dict): Mapping of ISO 4217 currency codes to mappings of years (str) to consumer price indices.
+            exchange_rates (dict): Mapping of ISO 4217 currency codes to mappings of years (str) to exchange rates
+                given as units of normalize_to per unit of the currency.
+            normalize_to (str, optional): Currency the exchange rates are normalized to.
+        """
+        self.cpi = cpi
+        self.exchange_rates = exchange_rates
+        self.normalize_to = normalize_to
+
+
+    def get_cpi(self, currency: str, year: str) -> float:
+        try:
+            return self.cpi[currency][str(year)]
+        except KeyError:
+            raise ValueError(f"CPI data not available for currency {currency} in {year}.")
+
+
+    def get_exchange_rate(self, currency: str, year: str) -> float:
+        try:
+            return self.exchange_rates[currency][str(year)]
+        except KeyError:
+            raise ValueError(f"Exchange rate not available for currency {currency} in {year}.")
+
+
+    def get_conversion_factor(self, base_year: str, base_currency: str, target_year: str, target_currency: str, operation_order: str="inflation_first") -> float:
+        """Get the factor to adjust a value for inflation and convert it to another currency.
+
+        Args:
+            base_year (str): Year of the base value.
+            base_currency (str): ISO code of the currency of the base value.
+            target_year (str): Year for conversion.
+            target_currency (str): ISO code of the target currency.
+            operation_order (str, optional): Either adjust for inflation in the base currency first ("inflation_first")
+                or exchange the currency in the base year first ("exchange_first").
+
+        Returns:
+            conversion_factor (float): The conversion factor.
+        """
+        base_year, target_year = str(base_year), str(target_year)
+        for year in [base_year, target_year]:
+            if int(year) > datetime.now().year:
+                raise ValueError(f"Year {year} is in the future. Currency conversion is only supported for past and current years.")
+
+        if operation_order == "inflation_first":
+            inflation_currency, exchange_year = base_currency, target_year
+        elif operation_order == "exchange_first":
+            inflation_currency, exchange_year = target_currency, base_year
+        else:
+            raise ValueError("operation_order must be 'inflation_first' or 'exchange_first'")
+
+        conversion_factor = 1.0
+        if base_year != target_year:
+            conversion_factor *= self.get_cpi(inflation_currency, target_year) / self.get_cpi(inflation_currency, base_year)
+        if base_currency != target_currency:
+            conversion_factor *= self.get_exchange_rate(base_currency, exchange_year) / self.get_exchange_rate(target_currency, exchange_year)
+
+        return conversion_factor
+
+
+    def convert_currency(self, value: float, base_year: str, base_currency: str, target_year: str, target_currency: str, operation_order: str="inflation_first") -> float:
+        """Adjusts a value for inflation and converts it to another currency.
+        Same signature as cucopy's Currency.convert_currency().
+        """
+        return value * self.get_conversion_factor(base_year, base_currency, target_year, target_currency, operation_order)
+
+
+    def convert_currency_array(self, values: np.ndarray, base_years: np.ndarray, base_currencies: np.ndarray, target_year: str, target_currency: str, operation_order: str="inflation_first") -> np.ndarray:
+        """Adjusts values given in different years and currencies for inflation and converts them to one target year and currency.
+        The conversion factor is determined only once for each combination of base year and currency.
+
+        Args:
+            values (np.ndarray): 1-D array of values to convert.
+            base_years (np.ndarray): Year of each value.
+            base_currencies (np.ndarray): ISO code of the currency of each value.
+            target_year (str): Year for conversion.
+            target_currency (str): ISO code of the target currency.
+            operation_order (str, optional): See get_conversion_factor().
+
+        Returns:
+            converted_values (np.ndarray): Converted values. Values for which no data is available are NaN.
+        """
+        values = np.asarray(values, dtype=float)
+        base_years = np.asarray(base_years).astype(str)
+        base_currencies = np.asarray(base_currencies).astype(str)
+        if not len(values) == len(base_years) == len(base_currencies):
+            raise ValueError("values, base_years, and base_currencies must have the same length.")
+
+        # Get conversion factor for each unique combination of base year and currency.
+        base_keys = np.char.add(np.char.add(base_currencies, "_"), base_years)
+        unique_base_keys, inverse_indices = np.unique(base_keys, return_inverse=True)
+        conversion_factors = np.empty(len(unique_base_keys))
+        for i, base_key in enumerate(unique_base_keys):
+            base_currency, base_year = base_key.split("_")
+            try:
+                conversion_factors[i] = self.get_conversion_factor(base_year, base_currency, target_year, target_currency, operation_order)
+            except ValueError:
+                # Data not available.
+                conversion_factors[i] = np.nan
+
+        return values * conversion_factors[inverse_indices]
+
+
+    def to_dict(self) -> dict:
+        return {"normalize_to": self.normalize_to, "cpi": self.cpi, "exchange_rates": self.exchange_rates}
+
+
+_CURRENCY_RATE_TABLES = {}
+
+def load_currency_rate_table(path: Path=None) -> CurrencyRateTable:
+    """Load the currency rate table. It is loaded on first use and shared afterwards.
+
+    Args:
+        path (Path, optional): Path of the table. Defaults to CURRENCY_RATE_TABLE_FILE in the static resources directory.
+
+    Returns:
+        currency_rate_table (CurrencyRateTable) or None: The currency rate table or None if the file does not exist.
+    """
+    path = Path(path or Path(CONFIG["static_resources_dir"]) / CURRENCY_RATE_TABLE_FILE).resolve()
+
+    if path not in _CURRENCY_RATE_TABLES:
+        if not path.is_file():
+            return None
+
+        with open(path, 'r') as f:
+            table = json.load(f)
+
+        _CURRENCY_RATE_TABLES[path] = CurrencyRateTable(table["cpi"], table["exchange_rates"], table.get("normalize_to", "USD"))
+
+    return _CURRENCY_RATE_TABLES[path]
+
+
+def create_currency_rate_table(currencies: list[str], years: list[int], path: Path=None, normalize_to: str="USD", verbose: bool=False) -> Path:
+    """Snapshot consumer price indices and exchange rates from cucopy into a currency rate table.
+    Requires cucopy and internet access to the data of the International Monetary Fund.
+
+    Args:
+        currencies (list[str]): ISO 4217 codes of the currencies.
+        years (list[int]): Years to include.
+        path (Path, optional): Path to write the table to. Defaults to CURRENCY_RATE_TABLE_FILE in the static resources directory.
+        normalize_to (str, optional): Currency the exchange rates are normalized to.
+        verbose (bool, optional): If True, print missing data points.
+
+    Returns:
+        path (Path): Path of the written table.
+    """
+    if Currency is None:
+        raise ImportError("cucopy is not installed. Cannot create currency rate table.")
+
+    path = Path(path or Path(CONFIG["static_resources_dir"]) / CURRENCY_RATE_TABLE_FILE)
+    cc = Currency(ignore_cache=False, normalize_to=normalize_to, aggregate_from="A")
+
+    cpi = {}
+    exchange_rates = {}
+    for currency in currencies:
+        for year in years:
+            for data, get_data_point in [(cpi, cc.parser.get_cpi), (exchange_rates, cc.parser.get_exchange_rate)]:
+                try:
+                    data_point = get_data_point(currency, str(year))
+                except Exception as e:
+                    if verbose:
+                        print(f"No {get_data_point.__name__.removeprefix('get_')} for {currency} in {year}: {e}")
+                    continue
+                if data_point is not None:
+                    data.setdefault(currency, {})[str(year)] = float(data_point)
+
+    with open(path, 'w') as f:
+        json.dump(CurrencyRateTable(cpi, exchange_rates, normalize_to).to_dict(), f, indent=4, sort_keys=True)
+
+    return path
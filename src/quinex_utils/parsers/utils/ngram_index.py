@@ -0,0 +1,69 @@
+import numpy as np
+from collections import defaultdict
+from typing import Iterable
+
+
+class NgramIndex:
+    """Inverted index of the character n-grams of a vocabulary for finding similar strings
+    without comparing the query to every string in the vocabulary.
+
+    The similarity of two strings is the Dice coefficient of their sets of lowercased
+    character n-grams, where the strings are padded with whitespace to weight their start
+    and end. It is between 0 (no common n-grams) and 1 (same n-grams).
+    """
+
+    def __init__(self, strings: Iterable[str], n: int=3):
+        """
+        Args:
+            strings (Iterable[str]): Vocabulary to index.
+            n (int, optional): Length of the character n-grams.
+        """
+        self.n = n
+        self.strings = tuple(strings)
+
+        postings = defaultdict(list)
+        ngram_counts = []
+        for string_id, string in enumerate(self.strings):
+            ngrams = self.get_ngrams(string)
+            ngram_counts.append(len(ngrams))
+            for ngram in ngrams:
+                postings[ngram].append(string_id)
+
+        self.postings = {ngram: np.array(string_ids, dtype=np.int32) for ngram, string_ids in postings.items()}
+        self.ngram_counts = np.array(ngram_counts, dtype=np.int32)
+
+
+    def get_ngrams(self, string: str) -> set:
+        """Get the set of lowercased character n-grams of a string padded with whitespace."""
+        padded_string = " " * (self.n - 1) + string.lower() + " "
+        return {padded_string[i:i+self.n] for i in range(len(padded_string) - self.n + 1)}
+
+
+    def search(self, query: str, limit: int=10, min_score: float=0.0) -> list[tuple[str, float]]:
+        """Find the strings in the vocabulary that are most similar to the query.
+
+        Args:
+            query (str): String to search for.
+            limit (int, optional): Maximum number of results.
+            min_score (float, optional): Minimum similarity of the results.
+
+        Returns:
+            results (list[tuple[str, float]]): Strings and their similarity to the query ordered from most to least similar.
+                Strings with the same similarity are ordered as in the vocabulary.
+        """
+        query_ngrams = self.get_ngrams(query)
+        string_ids = [self.postings[ngram] for ngram in query_ngrams if ngram in self.postings]
+        if len(string_ids) == 0:
+            return []
+
+        # Count common n-grams only for strings that have at least one n-gram in common with the query.
+        candidate_ids, common_ngram_counts = np.unique(np.concatenate(string_ids), return_counts=True)
+        scores = 2 * common_ngram_counts / (len(query_ngrams) + self.ngram_counts[candidate_ids])
+
+        results = []
+        for i in np.argsort(-scores, kind="stable")[:limit]:
+            if scores[i] < min_score:
+                break
+            results.append((self.strings[candidate_ids[i]], float(scores[i])))
+
+        return results
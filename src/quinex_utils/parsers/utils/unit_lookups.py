@@ -0,0 +1,641 @@
+import gc
+import sys
+import json
+import pickle
+import hashlib
+import numpy as np
+from pathlib import Path
+from fractions import Fraction
+from functools import lru_cache
+from types import MappingProxyType
+from collections import defaultdict
+from thefuzz.utils import full_process
+from quinex_utils import CONFIG
+from quinex_utils.functions.units import remove_exponent_from_ucum_code_of_single_unit
+from quinex_utils.parsers.utils.patterns import DIMENSION_VECTOR_PATTERN
+from quinex_utils.parsers.utils.aho_corasick import AhoCorasickAutomaton
+from quinex_utils.parsers.utils.ngram_index import NgramIndex
+from quinex_utils.parsers.utils.unit_profiles import UnitParserProfile
+
+
+# Static resources the unit parser is built from. The keys are used as names of the tables in the snapshot.
+UNIT_LOOKUP_SOURCES = {
+    "unit_symbol_lookup": "unit_symbol_lookup.json",
+    "unit_label_lookup": "unit_label_lookup.json",
+    "unit_priorities": "ambiguous_unit_priorities_curated.json",
+    "unit_dimensions_and_kinds": "unit_dimensions_and_kinds.json",
+}
+UNIT_LOOKUP_SNAPSHOT_FILE = "unit_lookups_snapshot.pickle"
+UNIT_QUANTITY_KINDS_FILE = "unit_quantity_kinds.json"
+QUDT_QUANTITY_KIND_PREFIX = "http://qudt.org/vocab/quantitykind/"
+
+# Increase if the content or layout of the snapshot changes.
+UNIT_LOOKUP_SNAPSHOT_FORMAT_VERSION = 4
+
+# Dimension vectors are packed into a single integer by interpreting their eight 
+# components as signed digits of a number with base 256. The packing is linear, that is, 
+# the key of a sum of dimension vectors is the sum of their keys as long as no component 
+# exceeds the digit range.
+DIMENSION_KEY_MAX_COMPONENT = 127
+DIMENSION_KEY_WEIGHTS = np.array([256**i for i in range(8)], dtype=np.int64)
+
+# Marker for surface forms that match multiple units which cannot be disambiguated.
+AMBIGUOUS_UNIT = "AMBIGUOUS_UNIT"
+
+
+def get_unit_lookup_source_hashes(static_resources_dir: Path=None) -> dict:
+    """Get the SHA-256 hashes of the JSON files the unit lookups are built from.
+
+    Args:
+        static_resources_dir (Path, optional): Directory of the JSON files. Defaults to the static resources of this package.
+
+    Returns:
+        source_hashes (dict): Mapping of file names to their SHA-256 hex digests.
+    """
+    static_resources_dir = Path(static_resources_dir or CONFIG["static_resources_dir"])
+
+    source_hashes = {}
+    for file_name in UNIT_LOOKUP_SOURCES.values():
+        with open(static_resources_dir / file_name, 'rb') as f:
+            source_hashes[file_name] = hashlib.sha256(f.read()).hexdigest()
+
+    return source_hashes
+
+
+def load_unit_lookups_from_json(static_resources_dir: Path=None) -> dict:
+    """Load the unit lookups from the JSON files in the static resources directory.
+
+    Args:
+        static_resources_dir (Path, optional): Directory of the JSON files. Defaults to the static resources of this package.
+
+    Returns:
+        lookups (dict): Mapping of table names (see UNIT_LOOKUP_SOURCES) to the loaded tables.
+    """
+    static_resources_dir = Path(static_resources_dir or CONFIG["static_resources_dir"])
+
+    lookups = {}
+    for name, file_name in UNIT_LOOKUP_SOURCES.items():
+        with open(static_resources_dir / file_name, 'r') as f:
+            lookups[name] = json.load(f)
+
+    return lookups
+
+
+def create_unit_lookup_snapshot(static_resources_dir: Path=None, snapshot_path: Path=None) -> Path:
+    """Compile the unit lookups into a binary snapshot that can be loaded much faster than the JSON files.
+    The snapshot contains a format version and the hashes of the JSON files it was built from to detect
+    if it is stale. It also contains the indexes derived from the lookups (see build_derived_unit_lookups()),
+    so that they do not have to be built again in every process.
+
+    Args:
+        static_resources_dir (Path, optional): Directory of the JSON files. Defaults to the static resources of this package.
+        snapshot_path (Path, optional): Path to write the snapshot to. Defaults to UNIT_LOOKUP_SNAPSHOT_FILE in the static resources directory.
+
+    Returns:
+        snapshot_path (Path): Path of the written snapshot.
+    """
+    static_resources_dir = Path(static_resources_dir or CONFIG["static_resources_dir"])
+    snapshot_path = Path(snapshot_path or static_resources_dir / UNIT_LOOKUP_SNAPSHOT_FILE)
+
+    lookups = freeze_lookup(load_unit_lookups_from_json(static_resources_dir))
+    lookups["derived_lookups"] = freeze_lookup(build_derived_unit_lookups(lookups))
+    snapshot = {
+        "format_version": UNIT_LOOKUP_SNAPSHOT_FORMAT_VERSION,
+        "source_hashes": get_unit_lookup_source_hashes(static_resources_dir),
+        "lookups": lookups,
+    }
+
+    # Note: Protocol 5 can be read by all supported Python versions.
+    with open(snapshot_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=5)
+
+    return snapshot_path
+
+
+def load_unit_lookup_snapshot(static_resources_dir: Path=None, snapshot_path: Path=None) -> dict:
+    """Load the unit lookups from the binary snapshot.
+
+    Args:
+        static_resources_dir (Path, optional): Directory of the JSON files. Defaults to the static resources of this package.
+        snapshot_path (Path, optional): Path of the snapshot. Defaults to UNIT_LOOKUP_SNAPSHOT_FILE in the static resources directory.
+
+    Returns:
+        lookups (dict) or None: The unit lookups including the derived indexes under the key "derived_lookups" or None 
+            if the snapshot does not exist, has another format version, or was not built from the current JSON files.
+    """
+    static_resources_dir = Path(static_resources_dir or CONFIG["static_resources_dir"])
+    snapshot_path = Path(snapshot_path or static_resources_dir / UNIT_LOOKUP_SNAPSHOT_FILE)
+
+    if not snapshot_path.is_file():
+        return None
+
+    try:
+        with open(snapshot_path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        # Snapshot is corrupted or was created with an incompatible version of this package.
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get("format_version") != UNIT_LOOKUP_SNAPSHOT_FORMAT_VERSION:
+        return None
+
+    if snapshot.get("source_hashes") != get_unit_lookup_source_hashes(static_resources_dir):
+        # The JSON files have been changed after the snapshot was created.
+        return None
+
+    return snapshot["lookups"]
+
+
+def load_unit_lookups(static_resources_dir: Path=None, verbose: bool=False) -> dict:
+    """Load the unit lookups from the binary snapshot and fall back
+    to the JSON files if the snapshot is missing or stale.
+
+    Args:
+        static_resources_dir (Path, optional): Directory of the JSON files. Defaults to the static resources of this package.
+        verbose (bool, optional): If True, print a warning when falling back to the JSON files.
+
+    Returns:
+        lookups (dict): Mapping of table names (see UNIT_LOOKUP_SOURCES) to the loaded tables including
+            the derived indexes under the key "derived_lookups" if loaded from the snapshot.
+    """
+    lookups = load_unit_lookup_snapshot(static_resources_dir)
+    if lookups is None:
+        if verbose:
+            print("Warning: Unit lookup snapshot is missing or stale. Loading unit lookups from JSON files instead. Run 'dev/parsers/update_lookups/6_create_lookup_snapshot.py' to update the snapshot.")
+        lookups = load_unit_lookups_from_json(static_resources_dir)
+
+    return lookups
+
+
+def load_unit_quantity_kinds(static_resources_dir: Path=None) -> dict:
+    """Load the lookup from unit URIs to their quantity kinds (e.g., {'qudt': ['Energy']}).
+
+    Args:
+        static_resources_dir (Path, optional): Directory of the JSON files. Defaults to the static resources of this package.
+
+    Returns:
+        unit_quantity_kinds (dict): Mapping of unit URIs to their quantity kinds.
+    """
+    static_resources_dir = Path(static_resources_dir or CONFIG["static_resources_dir"])
+    with open(static_resources_dir / UNIT_QUANTITY_KINDS_FILE, 'r') as f:
+        return json.load(f)
+
+
+def freeze_lookup(obj):
+    """Recursively convert the lists and sets of a lookup into tuples and frozensets. Dicts stay dicts, 
+    as the registry only wraps the tables into read-only mapping proxies (see UnitLookupRegistry). Strings 
+    are interned, so that the same unit URI is stored only once in the snapshot and in memory even if it 
+    occurs in many tables. Lookups are frozen when creating the snapshot and not again when loading it.
+    """
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    elif isinstance(obj, dict):
+        return {freeze_lookup(k): freeze_lookup(v) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return tuple(freeze_lookup(v) for v in obj)
+    elif isinstance(obj, (set, frozenset)):
+        return frozenset(freeze_lookup(v) for v in obj)
+    else:
+        return obj
+
+
+def dimension_vector_str_to_array(dimension_vector_str: str) -> np.ndarray:
+    """Convert a QUDT dimension vector string (e.g., 'A0E0L1I0M0H0T-1D0') into an array of eight integers.
+    Returns None if the string is not a dimension vector with integer components.
+    """
+    dimension_vector_matches = DIMENSION_VECTOR_PATTERN.match(dimension_vector_str or "")
+    if dimension_vector_matches is None:
+        return None
+    
+    return np.array([int(d) for d in dimension_vector_matches.groupdict().values()])
+
+
+def dimension_vector_to_key(dimension_vector: np.ndarray) -> int:
+    """Pack an integer dimension vector into a single integer. 
+    Returns None if a component is out of range, which no QUDT unit has.
+    """
+    if np.abs(dimension_vector).max() > DIMENSION_KEY_MAX_COMPONENT:
+        return None
+    
+    return int(np.dot(dimension_vector.astype(np.int64), DIMENSION_KEY_WEIGHTS))
+
+
+def conversion_multiplier_to_fraction(conversion_multiplier: float) -> Fraction:
+    """Convert a conversion multiplier into the exact rational number of its decimal representation
+    (e.g., 0.3048 to 381/1250). Returns None if the multiplier is None."""
+    if conversion_multiplier is None:
+        return None
+    
+    return Fraction(repr(conversion_multiplier))
+
+
+@lru_cache(maxsize=4096)
+def conversion_multiplier_power(conversion_multiplier: Fraction, exponent: float) -> Fraction:
+    """Raise a conversion multiplier to the exponent of a unit in a compound unit. The result is 
+    exact for integer exponents and a float otherwise. Results are cached for common exponents.
+    """
+    if conversion_multiplier == 0 and exponent < 0:
+        # Like Decimal, return infinity instead of raising an error.
+        return float("inf")
+    elif exponent == int(exponent):
+        return conversion_multiplier ** int(exponent)
+    else:
+        return float(conversion_multiplier) ** exponent
+
+
+def process_for_string_matching(s: str, is_query: bool=False) -> str:
+    """Normalize a string like thefuzz's process.extractOne() with the default processor 
+    and scorer does before matching (i.e., lowercase, ASCII, and only letters and numbers 
+    separated by single spaces). Note that the query is processed twice, first without and 
+    then with removing non-ASCII characters, whereas the choices are processed only once. 
+    A query and a choice have the maximum similarity score of 100 if their normalized forms 
+    are equal and not empty.
+    """
+    if is_query:
+        s = full_process(s)
+    
+    return full_process(s, force_ascii=True)
+
+
+def resolve_unit_link(unit_string_part: str, unit_symbol_lookup: dict, unit_label_lookup: dict, unit_priorities: dict, allowed_units: frozenset=None) -> str:
+    """Links a unit string part to a QUDT unit class using the symbol, label, and priority lookups.
+    In case of ambiguity, the unit with the highest priority is returned.
+
+    Args:
+        unit_string_part (str): Unit string part to link.
+        unit_symbol_lookup (dict): Mapping of unit symbols to QUDT unit URIs.
+        unit_label_lookup (dict): Mapping of lowercased unit labels to QUDT unit URIs.
+        unit_priorities (dict): Mapping of ambiguous unit expressions to the priorities of their QUDT unit URIs.
+        allowed_units (frozenset, optional): If given, only these QUDT unit URIs are considered.
+
+    Returns:
+        qudt_unit_class (str) or None: URI of a QUDT unit class, AMBIGUOUS_UNIT if the unit 
+            string part matches multiple units that cannot be disambiguated, or None if there is no match.
+    """
+    symbol_matches = unit_symbol_lookup.get(unit_string_part, ())
+    label_matches = unit_label_lookup.get(unit_string_part.lower(), ())
+
+    # As the label lookup mostly includes singular units, 
+    # we also check for plural units if no match was found.
+    if len(label_matches) == 0 and unit_string_part.endswith("s"):
+        # Remove trailing 's' from unit string part.
+        label_matches = unit_label_lookup.get(unit_string_part.lower()[:-1], ())
+    
+    # Note: Sorted to make the result independent of the hash seed.
+    matches = sorted({*symbol_matches, *label_matches})
+    if allowed_units is not None:
+        matches = [match for match in matches if match in allowed_units]
+
+    if len(matches) == 0:   
+        # No match.             
+        return None
+    elif len(matches) == 1:
+        # One match.
+        return matches[0]
+    
+    # Get priorities for unit.
+    priorities = unit_priorities.get(unit_string_part, {})
+    if len(priorities) == 0:
+        priorities = unit_priorities.get(unit_string_part.lower(), {})
+        if len(priorities) == 0 and unit_string_part.endswith("s"):
+            # Remove trailing 's' from unit string part.
+            priorities = unit_priorities.get(unit_string_part[:-1], {})
+            if len(priorities) == 0:
+                priorities = unit_priorities.get(unit_string_part.lower()[:-1], {})
+
+    prioritized_matches = [(priorities[match], match) for match in matches if priorities.get(match) is not None]
+    if len(prioritized_matches) > 0:
+        # Get unit with lowest value for prio.
+        min_prio = min(prio for prio, _ in prioritized_matches)
+        min_prio_matches = [match for prio, match in prioritized_matches if prio == min_prio]
+        if len(min_prio_matches) != 1:
+            # Multiple units with same priority.
+            return AMBIGUOUS_UNIT
+        else:
+            return min_prio_matches[0]
+    
+    # Maybe a lowered unit label was matched that is actually a unit symbol and should be treated case-sensitive.
+    if unit_string_part.startswith('M'):
+        # If unit starts with a capital 'M', remove units containing 'Milli' from matches.
+        matches = [match for match in matches if "Milli" not in match]
+    elif unit_string_part.startswith('m') and len(unit_string_part) > 1 and unit_string_part[1].isupper():                    
+        # If unit starts with a small 'm' and is not followed by a lowercase letter,
+        # and there is only one QUDT unit with 'Milli' in its URI, take that one.
+        matches = [match for match in matches if "Milli" in match]
+
+    if len(matches) == 1:
+        return matches[0]
+    else:
+        # Number of priorities does not match number of matches.
+        return AMBIGUOUS_UNIT
+
+
+def build_unit_link_table(unit_symbol_lookup: dict, unit_label_lookup: dict, unit_priorities: dict) -> dict:
+    """Resolve all known surface forms of units (symbols, labels, plural labels, and 
+    curated ambiguous expressions) to their final QUDT unit URI in advance.
+
+    Returns:
+        unit_link_table (dict): Mapping of surface forms to a QUDT unit URI, AMBIGUOUS_UNIT, or None.
+    """
+    surface_forms = set(unit_symbol_lookup.keys())
+    surface_forms.update(unit_label_lookup.keys())
+    surface_forms.update(label + "s" for label in unit_label_lookup.keys())
+    surface_forms.update(unit_priorities.keys())
+
+    unit_link_table = {}
+    for surface_form in sorted(surface_forms):
+        unit_link_table[surface_form] = resolve_unit_link(surface_form, unit_symbol_lookup, unit_label_lookup, unit_priorities)
+
+    return unit_link_table
+
+
+def build_derived_unit_lookups(lookups: dict) -> dict:
+    """Build the indexes derived from the unit lookups. As they only depend on the lookups, 
+    they are built once when creating the snapshot and not every time the registry is loaded.
+
+    Args:
+        lookups (dict): Mapping of table names (see UNIT_LOOKUP_SOURCES) to the loaded tables.
+
+    Returns:
+        derived_lookups (dict): Mapping of names of the derived indexes to the indexes (see UnitLookupRegistry).
+    """
+    unit_symbol_lookup = lookups["unit_symbol_lookup"]
+    unit_label_lookup = lookups["unit_label_lookup"]
+    unit_dimensions_and_kinds = lookups["unit_dimensions_and_kinds"]
+
+    # Remove all units with None as priority as well as remaining empty dicts.
+    unit_priorities = {}
+    for unit_expr, prios in lookups["unit_priorities"].items():
+        remaining_after_curation = {unit: prio for unit, prio in prios.items() if prio is not None}
+        if len(remaining_after_curation) > 0:
+            unit_priorities[unit_expr] = remaining_after_curation
+
+    # Group units by dimension vector and conversion multiplier.
+    conversion_lookup = defaultdict(dict)
+    for uri, info in unit_dimensions_and_kinds.items():
+        conversion_lookup[info['dimension_vector']].setdefault(info['conversion_multiplier'], []).append(uri)
+
+    # Get all surface forms of a unit.
+    reverse_symbol_label_lookup = defaultdict(list)
+    for symbol, uris in unit_symbol_lookup.items():
+        for uri in uris:
+            reverse_symbol_label_lookup[uri].append(symbol)
+    for label, uris in unit_label_lookup.items():
+        for uri in uris:
+            reverse_symbol_label_lookup[uri].append(label)
+
+    processed_surface_form_index = defaultdict(set)
+    for uri, surface_forms in reverse_symbol_label_lookup.items():
+        for surface_form in surface_forms:
+            processed_surface_form = process_for_string_matching(surface_form)
+            if len(processed_surface_form) > 0:
+                processed_surface_form_index[processed_surface_form].add(uri)
+
+    conversion_multipliers = {uri: conversion_multiplier_to_fraction(info['conversion_multiplier']) for uri, info in unit_dimensions_and_kinds.items()}
+
+    unit_ids = {}
+    dimension_matrix = np.zeros((len(unit_dimensions_and_kinds), 8), dtype=np.int8)
+    has_dimension_vector = np.zeros(len(unit_dimensions_and_kinds), dtype=bool)
+    conversion_lookup_by_dimension_key = defaultdict(dict)
+    for unit_id, (uri, info) in enumerate(unit_dimensions_and_kinds.items()):
+        unit_ids[uri] = unit_id
+        dimension_vector = dimension_vector_str_to_array(info['dimension_vector'])
+        if dimension_vector is not None:
+            dimension_matrix[unit_id] = dimension_vector
+            has_dimension_vector[unit_id] = True
+            dimension_key = dimension_vector_to_key(dimension_vector)
+            conversion_lookup_by_dimension_key[dimension_key].setdefault(info['conversion_multiplier'], []).append(uri)
+
+    is_dimensionless = (dimension_matrix[:, :7].sum(axis=1) == 0) & (dimension_matrix[:, 7] != 0)
+
+    applicable_systems = sorted({system for info in unit_dimensions_and_kinds.values() for system in info["applicable_system"]})
+    system_bits = {system: 1 << i for i, system in enumerate(applicable_systems)}
+    applicable_system_bitmasks = {}
+    for uri, info in unit_dimensions_and_kinds.items():
+        applicable_system_bitmasks[uri] = sum(system_bits[system] for system in set(info["applicable_system"]))
+
+    return {
+        "unit_priorities": unit_priorities,
+        "conversion_lookup": dict(conversion_lookup),
+        "reverse_symbol_label_lookup": dict(reverse_symbol_label_lookup),
+        "processed_surface_form_index": dict(processed_surface_form_index),
+        "conversion_multipliers": conversion_multipliers,
+        "unit_ids": unit_ids,
+        "dimension_matrix": dimension_matrix,
+        "has_dimension_vector": has_dimension_vector,
+        "is_dimensionless": is_dimensionless,
+        "conversion_lookup_by_dimension_key": dict(conversion_lookup_by_dimension_key),
+        "applicable_systems": applicable_systems,
+        "applicable_system_bitmasks": applicable_system_bitmasks,
+        "unit_link_table": build_unit_link_table(unit_symbol_lookup, unit_label_lookup, unit_priorities),
+    }
+
+
+class UnitLookupRegistry:
+    """Immutable collection of the unit lookups and the indexes derived from them.
+
+    The registry is loaded once per process using get_unit_lookup_registry() and
+    shared by all unit parser instances. All tables are read-only.
+    """
+
+    def __init__(self, lookups: dict, static_resources_dir: Path=None, profile: UnitParserProfile=None):
+
+        self.static_resources_dir = Path(static_resources_dir or CONFIG["static_resources_dir"])
+
+        # Profile the lookups are restricted to or None if all units are included.
+        self.profile = profile
+
+        # Indexes derived from the lookups are stored in the snapshot together with the frozen lookups 
+        # (see freeze_lookup()). They are only built if loaded from the JSON files or filtered by a profile.
+        derived_lookups = lookups.get("derived_lookups")
+        if derived_lookups is None:
+            lookups = freeze_lookup(lookups)
+            derived_lookups = freeze_lookup(build_derived_unit_lookups(lookups))
+
+        # Symbol and label lookups.
+        self.unit_symbol_lookup = MappingProxyType(lookups["unit_symbol_lookup"])
+        self.unit_label_lookup = MappingProxyType(lookups["unit_label_lookup"])
+
+        # Unit dimension and kind lookup.
+        self.unit_dimensions_and_kinds = MappingProxyType(lookups["unit_dimensions_and_kinds"])
+
+        # Priority lookup for ambiguous units without units with None as priority.
+        self.unit_priorities = MappingProxyType(derived_lookups["unit_priorities"])
+
+        # Units grouped by dimension vector and conversion multiplier.
+        self.conversion_lookup = MappingProxyType(derived_lookups["conversion_lookup"])
+
+        # All surface forms of a unit.
+        self.reverse_symbol_label_lookup = MappingProxyType(derived_lookups["reverse_symbol_label_lookup"])
+
+        # Index of surface forms normalized the same way thefuzz does before string matching.
+        self.processed_surface_form_index = MappingProxyType(derived_lookups["processed_surface_form_index"])
+
+        # Exact conversion multipliers.
+        self.conversion_multipliers = MappingProxyType(derived_lookups["conversion_multipliers"])
+
+        # Integer dimension matrix indexed by unit id. Units without a valid 
+        # dimension vector (e.g., with fractional exponents) are flagged.
+        self.unit_ids = MappingProxyType(derived_lookups["unit_ids"])
+        self.dimension_matrix = derived_lookups["dimension_matrix"]
+        self.has_dimension_vector = derived_lookups["has_dimension_vector"]
+
+        # Conversion of dimensionless units can lead to wrong unit conversions.
+        self.is_dimensionless = derived_lookups["is_dimensionless"]
+
+        for array in [self.dimension_matrix, self.has_dimension_vector, self.is_dimensionless]:
+            array.setflags(write=False)
+
+        # Units grouped by dimension key and conversion multiplier.
+        self.conversion_lookup_by_dimension_key = MappingProxyType(derived_lookups["conversion_lookup_by_dimension_key"])
+
+        # Applicable systems (e.g., SI or CGS) of each unit as bitmask, where 
+        # bit i is set if the unit is applicable to the i-th system.
+        self.applicable_systems = derived_lookups["applicable_systems"]
+        self.applicable_system_bitmasks = MappingProxyType(derived_lookups["applicable_system_bitmasks"])
+
+        # All known surface forms resolved to their QUDT unit in advance.
+        self.unit_link_table = MappingProxyType(derived_lookups["unit_link_table"])
+
+        # Lazily loaded lookups.
+        self._lazy_lookups = {}
+
+        self._is_frozen = True
+
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_is_frozen", False):
+            raise AttributeError("UnitLookupRegistry is immutable.")
+        super().__setattr__(name, value)
+
+
+    def get_applicable_systems(self, applicable_system_bitmask: int) -> set:
+        """Get the names of the applicable systems encoded in a bitmask."""
+        return {system for i, system in enumerate(self.applicable_systems) if applicable_system_bitmask >> i & 1}
+
+
+    def get_unit_surface_form_automaton(self) -> AhoCorasickAutomaton:
+        """Get the automaton for finding known unit surface forms in text, which is only built on first use.
+        The surface forms are lowercased, so that labels are found regardless of their capitalization.
+        """
+        if "unit_surface_form_automaton" not in self._lazy_lookups:
+            surface_forms = sorted({surface_form.lower() for surface_form, uri in self.unit_link_table.items() if uri is not None})
+            self._lazy_lookups["unit_surface_form_automaton"] = AhoCorasickAutomaton(surface_forms)
+
+        return self._lazy_lookups["unit_surface_form_automaton"]
+
+
+    def get_surface_form_ngram_index(self) -> NgramIndex:
+        """Get the character n-gram index of all unit surface forms for fuzzy matching, which is only built on first use.
+        Besides the symbols and labels in reverse_symbol_label_lookup, plural labels are included (see build_unit_link_table()).
+        """
+        if "surface_form_ngram_index" not in self._lazy_lookups:
+            surface_forms = sorted(surface_form for surface_form, uri in self.unit_link_table.items() if uri is not None)
+            self._lazy_lookups["surface_form_ngram_index"] = NgramIndex(surface_forms)
+
+        return self._lazy_lookups["surface_form_ngram_index"]
+
+
+    def get_unit_quantity_kinds(self) -> MappingProxyType:
+        """Get the lookup from unit URIs to the names of their QUDT quantity kinds (e.g., 'Time'), which is only loaded on first use."""
+        if "unit_quantity_kinds" not in self._lazy_lookups:
+            self._load_quantity_kind_index()
+
+        return self._lazy_lookups["unit_quantity_kinds"]
+
+
+    def get_units_by_quantity_kind(self) -> MappingProxyType:
+        """Get the lookup from names of QUDT quantity kinds to unit URIs, which is only loaded on first use."""
+        if "units_by_quantity_kind" not in self._lazy_lookups:
+            self._load_quantity_kind_index()
+
+        return self._lazy_lookups["units_by_quantity_kind"]
+
+
+    def _load_quantity_kind_index(self):
+        # Only units in the registry are included (see UnitParserProfile).
+        unit_quantity_kinds = {uri: quantity_kinds for uri, quantity_kinds in load_unit_quantity_kinds(self.static_resources_dir).items() if uri in self.unit_dimensions_and_kinds}
+
+        units_by_quantity_kind = defaultdict(set)
+        for uri, quantity_kinds in unit_quantity_kinds.items():
+            for quantity_kind in quantity_kinds["qudt"]:
+                units_by_quantity_kind[quantity_kind].add(uri)
+
+        self._lazy_lookups["unit_quantity_kinds"] = MappingProxyType(freeze_lookup({uri: frozenset(quantity_kinds["qudt"]) for uri, quantity_kinds in unit_quantity_kinds.items()}))
+        self._lazy_lookups["units_by_quantity_kind"] = MappingProxyType(freeze_lookup({quantity_kind: frozenset(uris) for quantity_kind, uris in units_by_quantity_kind.items()}))
+
+
+    def get_ucum_code_lookup(self) -> MappingProxyType:
+        """Get the lookup from unit URIs to UCUM codes, which is only loaded on first use."""
+        if "ucum_code_lookup" not in self._lazy_lookups:
+            with open(self.static_resources_dir / "ucum_codes.json", 'r') as f:
+                self._lazy_lookups["ucum_code_lookup"] = MappingProxyType(freeze_lookup(json.load(f)))
+
+        return self._lazy_lookups["ucum_code_lookup"]
+
+
+    def get_ucum_code_part_lookup(self) -> MappingProxyType:
+        """Get the lookup from unit URIs to the UCUM codes split into the code without exponent and 
+        the exponent (see remove_exponent_from_ucum_code_of_single_unit()), which is only computed on first use.
+        """
+        if "ucum_code_part_lookup" not in self._lazy_lookups:
+            self._lazy_lookups["ucum_code_part_lookup"] = MappingProxyType(freeze_lookup({
+                uri: tuple(remove_exponent_from_ucum_code_of_single_unit(ucum_code) for ucum_code in ucum_codes)
+                for uri, ucum_codes in self.get_ucum_code_lookup().items()
+            }))
+
+        return self._lazy_lookups["ucum_code_part_lookup"]
+
+
+_UNIT_LOOKUP_REGISTRIES = {}
+
+def get_unit_lookup_registry(static_resources_dir: Path=None, verbose: bool=False, profile: UnitParserProfile=None) -> UnitLookupRegistry:
+    """Get the process-wide unit lookup registry. It is loaded on first use and shared afterwards.
+
+    Args:
+        static_resources_dir (Path, optional): Directory of the JSON files. Defaults to the static resources of this package.
+        verbose (bool, optional): If True, print a warning when the snapshot is stale.
+        profile (UnitParserProfile, optional): If given, the registry only includes the units of the profile.
+            Registries of profiles including the same units are shared.
+
+    Returns:
+        registry (UnitLookupRegistry): The shared unit lookup registry.
+    """
+    static_resources_dir = Path(static_resources_dir or CONFIG["static_resources_dir"]).resolve()
+
+    key = (static_resources_dir, profile.get_key() if profile is not None else None)
+    registry = _UNIT_LOOKUP_REGISTRIES.get(key)
+    if registry is None:
+        lookups = load_unit_lookups(static_resources_dir, verbose=verbose)
+        if profile is not None:
+            # The indexes derived from the filtered lookups are built again.
+            lookups = profile.filter_unit_lookups(lookups, load_unit_quantity_kinds(static_resources_dir))
+        registry = UnitLookupRegistry(lookups, static_resources_dir, profile)
+        _UNIT_LOOKUP_REGISTRIES[key] = registry
+
+    return registry
+
+
+def preload_unit_lookup_registry(static_resources_dir: Path=None, load_ucum_codes: bool=False, profile: UnitParserProfile=None) -> UnitLookupRegistry:
+    """Load the unit lookup registry before forking worker processes.
+
+    The objects allocated so far are moved to the permanent generation of the garbage 
+    collector (see gc.freeze()). Hence, the garbage collector of the worker processes 
+    does not write to the memory pages of the registry and the pages stay shared 
+    between the processes instead of being copied on write.
+
+    Args:
+        static_resources_dir (Path, optional): Directory of the JSON files. Defaults to the static resources of this package.
+        load_ucum_codes (bool, optional): If True, also load the UCUM code lookup.
+        profile (UnitParserProfile, optional): If given, load the registry restricted to the units of the profile.
+
+    Returns:
+        registry (UnitLookupRegistry): The shared unit lookup registry.
+    """
+    registry = get_unit_lookup_registry(static_resources_dir, profile=profile)
+    if load_ucum_codes:
+        registry.get_ucum_code_part_lookup()
+
+    gc.freeze()
+
+    return registry
@@ -0,0 +1,152 @@
+import json
+from pathlib import Path
+
+
+class UnitParserProfile:
+    """Whitelist of the units a unit parser links to. A unit is included if it has one of the
+    quantity kinds or dimension vectors of the profile or if its URI starts with one of the
+    URI prefixes of the profile.
+
+    Restricting the unit parser to the units of a domain results in smaller lookup tables
+    and less ambiguity (e.g., 'a' can only be linked to a year if areas are excluded).
+    """
+
+    def __init__(self, name: str=None, quantity_kinds: list[str]=(), dimension_vectors: list[str]=(), uri_prefixes: list[str]=()):
+        """
+        Args:
+            name (str, optional): Name of the profile.
+            quantity_kinds (list[str], optional): Names of QUDT quantity kinds (e.g., 'Energy').
+            dimension_vectors (list[str], optional): QUDT dimension vectors (e.g., 'A0E0L2I0M1H0T-2D0').
+            uri_prefixes (list[str], optional): Prefixes of QUDT unit URIs (e.g., 'http://qudt.org/vocab/unit/CCY_').
+        """
+        self.name = name
+        self.quantity_kinds = tuple(sorted(set(quantity_kinds)))
+        self.dimension_vectors = tuple(sorted(set(dimension_vectors)))
+        self.uri_prefixes = tuple(sorted(set(uri_prefixes)))
+
+        if len(self.quantity_kinds) + len(self.dimension_vectors) + len(self.uri_prefixes) == 0:
+            raise ValueError("Unit parser profile must include at least one quantity kind, dimension vector, or URI prefix.")
+
+
+    def __eq__(self, other):
+        return isinstance(other, UnitParserProfile) and self.get_key() == other.get_key()
+
+
+    def __hash__(self):
+        return hash(self.get_key())
+
+
+    def __repr__(self):
+        return f"UnitParserProfile(name={self.name!r}, quantity_kinds={list(self.quantity_kinds)}, dimension_vectors={list(self.dimension_vectors)}, uri_prefixes={list(self.uri_prefixes)})"
+
+
+    def get_key(self) -> tuple:
+        """Get a key that is the same for all profiles including the same units. The name is ignored."""
+        return (self.quantity_kinds, self.dimension_vectors, self.uri_prefixes)
+
+
+    def select_units(self, unit_dimensions_and_kinds: dict, unit_quantity_kinds: dict) -> set:
+        """Get the URIs of the units included in the profile.
+
+        Args:
+            unit_dimensions_and_kinds (dict): Mapping of unit URIs to their dimension vector, conversion multiplier, etc.
+            unit_quantity_kinds (dict): Mapping of unit URIs to their quantity kinds as in unit_quantity_kinds.json.
+
+        Returns:
+            uris (set): URIs of the included units.
+        """
+        quantity_kinds = set(self.quantity_kinds)
+        dimension_vectors = set(self.dimension_vectors)
+
+        uris = set()
+        for uri, info in unit_dimensions_and_kinds.items():
+            if info["dimension_vector"] in dimension_vectors \
+                or uri.startswith(self.uri_prefixes) \
+                    or not quantity_kinds.isdisjoint(unit_quantity_kinds.get(uri, {}).get("qudt", ())):
+                uris.add(uri)
+
+        return uris
+
+
+    def filter_unit_lookups(self, lookups: dict, unit_quantity_kinds: dict) -> dict:
+        """Remove all units that are not included in the profile from the unit lookups.
+
+        Args:
+            lookups (dict): Mapping of table names (see UNIT_LOOKUP_SOURCES) to the loaded tables.
+            unit_quantity_kinds (dict): Mapping of unit URIs to their quantity kinds as in unit_quantity_kinds.json.
+
+        Returns:
+            filtered_lookups (dict): The unit lookups without the excluded units. Surface forms without
+                remaining units are removed. Derived indexes are not included and need to be built again.
+        """
+        uris = self.select_units(lookups["unit_dimensions_and_kinds"], unit_quantity_kinds)
+
+        filtered_lookups = {}
+        for name in ["unit_symbol_lookup", "unit_label_lookup"]:
+            filtered_lookups[name] = {}
+            for surface_form, surface_form_uris in lookups[name].items():
+                remaining_uris = [uri for uri in surface_form_uris if uri in uris]
+                if len(remaining_uris) > 0:
+                    filtered_lookups[name][surface_form] = remaining_uris
+
+        filtered_lookups["unit_priorities"] = {}
+        for unit_expr, prios in lookups["unit_priorities"].items():
+            remaining_prios = {uri: prio for uri, prio in prios.items() if uri in uris}
+            if len(remaining_prios) > 0:
+                filtered_lookups["unit_priorities"][unit_expr] = remaining_prios
+
+        filtered_lookups["unit_dimensions_and_kinds"] = {uri: info for uri, info in lookups["unit_dimensions_and_kinds"].items() if uri in uris}
+
+        return filtered_lookups
+
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "quantity_kinds": list(self.quantity_kinds), "dimension_vectors": list(self.dimension_vectors), "uri_prefixes": list(self.uri_prefixes)}
+
+
+    @classmethod
+    def from_dict(cls, profile: dict) -> "UnitParserProfile":
+        return cls(profile.get("name"), profile.get("quantity_kinds", ()), profile.get("dimension_vectors", ()), profile.get("uri_prefixes", ()))
+
+
+    def save(self, path: Path) -> Path:
+        """Save the profile as JSON file, which can be loaded with get_unit_parser_profile()."""
+        path = Path(path)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+        return path
+
+
+# Predefined profiles that can be selected by name.
+NAMED_UNIT_PARSER_PROFILES = {
+    "energy_systems": UnitParserProfile(
+        name="energy_systems",
+        quantity_kinds=["Energy", "Power", "Mass", "Time", "Currency"],
+    ),
+}
+
+
+def get_unit_parser_profile(profile) -> UnitParserProfile:
+    """Get a unit parser profile.
+
+    Args:
+        profile (str, dict, Path, or UnitParserProfile): Name of a predefined profile (see NAMED_UNIT_PARSER_PROFILES),
+            the profile as dict (see UnitParserProfile.to_dict()), the path to a JSON file of the profile, or the profile itself.
+
+    Returns:
+        profile (UnitParserProfile): The unit parser profile.
+    """
+    if isinstance(profile, UnitParserProfile):
+        return profile
+    elif isinstance(profile, str):
+        if profile not in NAMED_UNIT_PARSER_PROFILES:
+            raise ValueError(f'Unknown unit parser profile "{profile}". Choose one of {list(NAMED_UNIT_PARSER_PROFILES)}.')
+        return NAMED_UNIT_PARSER_PROFILES[profile]
+    elif isinstance(profile, dict):
+        return UnitParserProfile.from_dict(profile)
+    elif isinstance(profile, Path):
+        with open(profile, 'r') as f:
+            return UnitParserProfile.from_dict(json.load(f))
+    else:
+        raise TypeError(f"Unit parser profile must be a name, dict, path, or UnitParserProfile, not {type(profile).__name__}.")
@@ -0,0 +1,147 @@
+from quinex_utils.parsers.utils.patterns import UNIT_TOKENIZATION_PATTERN
+
+
+# For shorter unit strings, the regex is faster despite its quadratic time complexity.
+MAX_UNIT_STRING_LENGTH_FOR_REGEX = 400
+
+UNIT_SEPARATOR_CHARS = frozenset("/*^")
+OPENING_BRACKETS = frozenset("[({")
+CLOSING_BRACKETS = frozenset("])}")
+
+
+def tokenize_unit_string(unit_string: str) -> list[str]:
+    """Splits a unit string at whitespace, '/', "*", "^", 4-digit numbers (optionally within
+    curly braces and preceded by an underscore), which are likely to be years, between units
+    and exponents, and at brackets, but keeps strings inside parantheses intact.
+
+    The result is the same as splitting with UNIT_TOKENIZATION_PATTERN and removing
+    empty strings and single spaces. The regex checks at every position whether it is 
+    inside parentheses by looking ahead for the next closing parenthesis, which takes 
+    quadratic time. Therefore, long unit strings are tokenized in a single pass instead.
+    The regex also cannot keep nested parentheses intact (e.g., '(m (s))'), so unit 
+    strings with nested parentheses are tokenized in a single pass as well.
+
+    Args:
+        unit_string (str): Unit string to tokenize.
+
+    Returns:
+        unit_string_parts (list[str]): The tokens of the unit string.
+
+    Examples:
+        >>> tokenize_unit_string("$(kWh)-1")
+        ['$', '(kWh)', '-1']
+        >>> tokenize_unit_string("TWh kg*s^2/(m^2 per year)^3")
+        ['TWh', 'kg', '*', 's', '^', '2', '/', '(m^2 per year)', '^', '3']
+        >>> tokenize_unit_string("kg/(m (per year))^2")
+        ['kg', '/', '(m (per year))', '^', '2']
+    """
+    if len(unit_string) <= MAX_UNIT_STRING_LENGTH_FOR_REGEX and not has_nested_parentheses(unit_string):
+        return [part for part in UNIT_TOKENIZATION_PATTERN.split(unit_string) if part not in ['', ' ']]
+    else:
+        return scan_unit_string(unit_string)
+
+
+def get_parenthesis_depths(unit_string: str) -> list[int]:
+    """Get the number of open parentheses before each position of the unit string
+    or None if the parentheses are not balanced."""
+    depth = 0
+    depths = []
+    for c in unit_string:
+        depths.append(depth)
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth < 0:
+                return None
+    depths.append(depth)
+
+    return depths if depth == 0 else None
+
+
+def has_nested_parentheses(unit_string: str) -> bool:
+    """Check whether the unit string has balanced and nested parentheses (e.g., '(m (s))')."""
+    if unit_string.count("(") < 2:
+        return False
+    depths = get_parenthesis_depths(unit_string)
+    return depths is not None and max(depths) > 1
+
+
+def scan_unit_string(unit_string: str) -> list[str]:
+    """Tokenizes a unit string in linear time. See tokenize_unit_string()."""
+    n = len(unit_string)
+
+    # Splitting is only allowed outside of parentheses.
+    depths = get_parenthesis_depths(unit_string)
+    if depths is not None:
+        # Balanced parentheses. A position is inside parentheses if any parenthesis before it is still open.
+        is_outside_parentheses = [depth == 0 for depth in depths]
+    else:
+        # A position is inside parentheses if the next parenthesis is a closing one.
+        is_outside_parentheses = [True] * (n + 1)
+        next_parenthesis = None
+        for i in range(n - 1, -1, -1):
+            if unit_string[i] in "()":
+                next_parenthesis = unit_string[i]
+            is_outside_parentheses[i] = next_parenthesis != ")"
+
+    def match_separator(i: int, allow_empty: bool) -> int:
+        """Returns the end of the separator starting at position i or -1 if there is none.
+        The alternatives are tried in the same order as in UNIT_TOKENIZATION_PATTERN.
+        """
+        if not is_outside_parentheses[i]:
+            return -1
+
+        if i < n:
+            # Whitespace, '/', '*', or '^'.
+            if unit_string[i].isspace() or unit_string[i] in UNIT_SEPARATOR_CHARS:
+                return i + 1
+
+            # Years (e.g., '2021', '_2021', or '_{2021}').
+            j = i
+            if unit_string[j] == "_":
+                j += 1
+            if j < n and unit_string[j] == "{":
+                j += 1
+            if j + 4 <= n and all(c.isdecimal() for c in unit_string[j:j+4]):
+                j += 4
+                if j < n and unit_string[j] == "}":
+                    j += 1
+                return j
+
+        if not allow_empty:
+            return -1
+
+        # Between units and exponents.
+        if i < n and (i == 0 or not (unit_string[i-1].isdecimal() or unit_string[i-1] == "-")):
+            if unit_string[i].isdecimal() or (unit_string[i] == "-" and i + 1 < n and unit_string[i+1].isdecimal()):
+                return i
+
+        # After closing brackets and before opening brackets.
+        if (i > 0 and unit_string[i-1] in CLOSING_BRACKETS) or (i < n and unit_string[i] in OPENING_BRACKETS):
+            return i
+
+        return -1
+
+    unit_string_parts = []
+    token_start = 0
+    i = 0
+    must_advance = False
+    while i <= n:
+        end = match_separator(i, allow_empty=not must_advance)
+        if end == -1:
+            i += 1
+            must_advance = False
+            continue
+
+        unit_string_parts.append(unit_string[token_start:i])
+        unit_string_parts.append(unit_string[i:end])
+        token_start = end
+        # Like re.split(), an empty separator must not directly follow another empty separator.
+        must_advance = end == i
+        i = end
+
+    unit_string_parts.append(unit_string[token_start:])
+
+    # Remove empty strings and single spaces from list.
+    return [part for part in unit_string_parts if part not in ['', ' ']]
@@ -1,11 +1,13 @@
 
 import pytest
 import time
+import itertools
 import pprint
 from quinex_utils.lookups.quantity_modifiers import PREFIXED_QUANTITY_MODIFIERS, SUFFIXED_QUANTITY_MODIFIERS
 from quinex_utils.functions.normalize import normalize_quantity_span
 from quinex_utils.functions.str2num import parse_value_and_order_of_magnitude_separately
-from quinex_utils.parsers.quantity_parser import FastSymbolicQuantityParser
+from quinex_utils.parsers.quantity_parser import FastSymbolicQuantityParser, iter_valid_role_sets, get_most_preferred_role_sets, INVALID_ROLE_SUBPATTERN_MATCHER
+from quinex_utils.parsers.utils.aho_corasick import AhoCorasickAutomaton
 
 
 pp = pprint.PrettyPrinter(indent=1)
@@ -3734,6 +3736,99 @@ def test_quantity_parser_additional():
         print("- " + failed_string)
 
 
+def test_token_role_enumeration():
+    roles = [["number"], ["range_separator", "math_operator", "unit"], ["whitespace"], ["range_separator", "unit"], ["number"]]
+    role_sets = list(iter_valid_role_sets(roles, INVALID_ROLE_SUBPATTERN_MATCHER))
+    assert role_sets == [role_set for role_set in itertools.product(*roles) if role_set[1:4] != ("range_separator", "whitespace", "range_separator")]
+    assert list(iter_valid_role_sets(roles, INVALID_ROLE_SUBPATTERN_MATCHER, max_deviations=0)) == []
+    assert list(iter_valid_role_sets([], INVALID_ROLE_SUBPATTERN_MATCHER)) == [()]
+
+    # Multiple and overlapping invalid subpatterns.
+    invalid_subpatterns = [("unit", "whitespace"), ("math_operator", "whitespace", "range_separator"), ("whitespace", "range_separator", "number")]
+    contains_invalid_subpattern = lambda role_set: any(role_set[i:i+len(p)] == p for p in invalid_subpatterns for i in range(len(role_set)))
+    role_sets = list(iter_valid_role_sets(roles, AhoCorasickAutomaton(invalid_subpatterns)))
+    assert role_sets == [role_set for role_set in itertools.product(*roles) if not contains_invalid_subpattern(role_set)]
+
+    # The role sets closest to the preferred roles are kept.
+    assert get_most_preferred_role_sets(roles, INVALID_ROLE_SUBPATTERN_MATCHER, 2) == [
+        ("number", "range_separator", "whitespace", "unit", "number"),
+        ("number", "math_operator", "whitespace", "range_separator", "number"),
+    ]
+
+    quantity_parts = FastSymbolicQuantityParser().tokenize_quantity_str("1-2, 3-4, 5-6 and 7-8 min")
+    assert len(FastSymbolicQuantityParser().get_token_roles(quantity_parts)) > 2
+    quantity_parser = FastSymbolicQuantityParser(max_role_sets=2)
+    assert len(quantity_parser.get_token_roles(quantity_parts)) == 2
+    assert quantity_parser.parse("1-2, 3-4, 5-6 and 7-8 min")["nbr_quantities"] > 0
+
+    # By default, all role sets are considered. A limit can change the result of spans with many role sets.
+    quantity_span = "about 3 kWh - 2-3 min €/MWh - 1e5 kWh - 2-3 min $2021/kWh"
+    quantity_parts = FastSymbolicQuantityParser().tokenize_quantity_str(quantity_span)
+    assert len(FastSymbolicQuantityParser().get_token_roles(quantity_parts)) == 1152
+    assert FastSymbolicQuantityParser().parse(quantity_span)["separators"] == [("/", "prefixed_quantity_modifier")]
+    assert FastSymbolicQuantityParser(max_role_sets=1024).parse(quantity_span)["separators"] == [("min", "prefixed_quantity_modifier")]
+
+
+def test_quantity_parse_cache():
+    quantity_parser = FastSymbolicQuantityParser(cache_size=2)
+    uncached_quantity_parser = FastSymbolicQuantityParser()
+    assert uncached_quantity_parser.cache_info()["maxsize"] == 0
+
+    result = quantity_parser.parse("1 kW")
+    assert quantity_parser.parse("1 kW") == result == uncached_quantity_parser.parse("1 kW")
+    assert quantity_parser.parse("1 kW", simplify_results=True) == uncached_quantity_parser.parse("1 kW", simplify_results=True)
+    assert quantity_parser.cache_info()["hits"] == 1
+    assert quantity_parser.cache_info()["misses"] == 2
+
+    # Modifying a result does not affect the cache.
+    result = quantity_parser.parse("1 kW")
+    result["normalized_quantities"][0]["value"]["normalized"]["numeric_value"] = 2
+    result["normalized_quantities"].clear()
+    assert quantity_parser.parse("1 kW") == uncached_quantity_parser.parse("1 kW")
+    assert type(quantity_parser.parse("1 kW")["normalized_quantities"]) is list
+
+    quantity_parser.parse("100%")
+    quantity_parser.parse("a few")
+    assert quantity_parser.cache_info()["evictions"] > 0
+    quantity_parser.clear_cache()
+    assert quantity_parser.cache_info()["currsize"] == 0
+
+
+def test_quantity_parse_batch():
+    quantity_parser = FastSymbolicQuantityParser(cache_size=16)
+    quantity_spans = ["1 kW", "100%", "2020", "1 kW", "a few", "5-10 t", "100%"]
+    expected_results = [FastSymbolicQuantityParser().parse(quantity_span) for quantity_span in quantity_spans]
+
+    results = quantity_parser.parse_batch(quantity_spans)
+    assert results == expected_results
+    assert quantity_parser.cache_info()["misses"] == len(set(quantity_spans))
+    assert results[0] is not results[3]
+
+    assert quantity_parser.parse_batch(quantity_spans, workers=2, chunksize=2) == expected_results
+    assert quantity_parser.parse_batch([]) == []
+
+
+def test_sliding_window_parser_memoization():
+    quantity_parser = FastSymbolicQuantityParser()
+    quantity_parts = ['about', ' ', '1.24', ' ', 'million', ' ', 'euros']
+    expected_result = quantity_parser.sliding_window_parser(quantity_parts)
+    assert expected_result["prefixed_modifier"]["normalized"] == "~"
+    assert expected_result["suffixed_unit"]["text"] == "euros"
+
+    # Shared memoized normalizations give the same results, which do not share mutable objects.
+    normalization_cache = {}
+    result = quantity_parser.sliding_window_parser(quantity_parts, normalization_cache)
+    assert result == expected_result
+    assert len(normalization_cache) > 0
+    result["value"]["normalized"].pop("order_of_magnitude")
+    assert quantity_parser.sliding_window_parser(quantity_parts, normalization_cache) == expected_result
+
+    # Modifier windows are only extended while they can become a known modifier.
+    assert "atle" in quantity_parser.PREFIXED_QUANTITY_MODIFIER_PREFIXES
+    assert "about1" not in quantity_parser.PREFIXED_QUANTITY_MODIFIER_PREFIXES
+    assert ("prefixed_modifier", "about 1.24") not in normalization_cache
+
+
 if __name__ == "__main__":
     start = time.perf_counter()
     test_parse_value_and_order_of_magnitude_separately()
@@ -3757,5 +3852,9 @@ if __name__ == "__main__":
     test_quantity_parser_on_imprecise_quantities()
     test_quantity_parser_on_stats_expr()
     test_quantity_parser_additional()
+    test_token_role_enumeration()
+    test_quantity_parse_cache()
+    test_quantity_parse_batch()
+    test_sliding_window_parser_memoization()
     end = time.perf_counter()
     print("Elapsed time = {}s".format((end - start)))
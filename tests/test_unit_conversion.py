@@ -1,5 +1,10 @@
 import pytest
+import json
+import tempfile
+from pathlib import Path
+import numpy as np
 from quinex_utils.parsers.unit_parser import FastSymbolicUnitParser
+from quinex_utils.parsers.utils.currency_rates import CurrencyRateTable, load_currency_rate_table
 
 
 def test_unit_conversion():
@@ -27,6 +32,85 @@ def test_unit_conversion():
     assert allow_conversion == False
 
 
+def test_unit_conversion_array():
+    unit_parser = FastSymbolicUnitParser()
+    kwh = unit_parser.parse("kWh")
+    gj = unit_parser.parse("GJ")
+    values = np.array([1.0, 2.5, 10.0])
+    
+    converted_values, conv_unit = unit_parser.unit_conversion_array(values, kwh, gj)
+    assert conv_unit == [('GJ', 1, 'http://qudt.org/vocab/unit/GigaJ', None)]
+    for value, converted_value in zip(values, converted_values):
+        assert converted_value == pytest.approx(unit_parser.unit_conversion(value, kwh, gj)[0])
+    
+    # Conversion not possible.
+    assert unit_parser.unit_conversion_array(values, unit_parser.parse("kg"), gj) == (None, None)
+
+    # Column with mixed units.
+    converted_values, conv_unit = unit_parser.unit_conversion_array(values, None, gj, from_compound_units=[kwh, unit_parser.parse("kg"), unit_parser.parse("kJ")])
+    assert converted_values[0] == pytest.approx(0.0036)
+    assert np.isnan(converted_values[1])
+    assert converted_values[2] == pytest.approx(1e-5)
+
+
+def test_conversion_plans():
+    unit_parser = FastSymbolicUnitParser()
+    from_unit = [('kWh', 1, 'http://qudt.org/vocab/unit/KiloW-HR', None), ('kg', -1, 'http://qudt.org/vocab/unit/KiloGM', None)]
+    to_unit = [('J', 1, 'http://qudt.org/vocab/unit/J', None), ('g', -1, 'http://qudt.org/vocab/unit/GM', None)]
+    conv_value, conv_unit = unit_parser.unit_conversion(9.5, from_unit, to_unit)
+    assert conv_value == pytest.approx(34200)
+
+    # Plans are cached independent of the order of the units.
+    plan = unit_parser.get_conversion_plan(from_unit, to_unit)
+    assert plan.is_possible and plan.factor == pytest.approx(3600)
+    misses = unit_parser.conversion_plan_cache.info()["misses"]
+    reversed_plan = unit_parser.get_conversion_plan(from_unit[::-1], to_unit[::-1])
+    assert unit_parser.conversion_plan_cache.info()["misses"] == misses
+    assert reversed_plan.factor == plan.factor
+
+    # The resolved target unit is in the order of the given target unit.
+    assert list(plan.target_unit) == to_unit
+    assert list(reversed_plan.target_unit) == to_unit[::-1]
+    assert unit_parser.unit_conversion(9.5, from_unit[::-1], to_unit)[1] == to_unit
+    
+    # Conversion is not possible if not all source units can be converted.
+    plan = unit_parser.get_conversion_plan(unit_parser.parse("h ft2"), unit_parser.parse("min"))
+    assert not plan.is_possible and plan.reason is not None
+    assert plan.apply(9.5) == (None, None)
+
+    # The source unit is not modified.
+    from_unit = [('ct', 1, 'http://qudt.org/PLACEHOLDER_CENT', None), ('€', 1, 'http://qudt.org/vocab/unit/CCY_EUR', None)]
+    unit_parser.get_conversion_plan(from_unit, unit_parser.parse("kWh"))
+    assert len(from_unit) == 2
+
+
+def test_currency_rate_table(tmp_path):
+    table = CurrencyRateTable(
+        cpi={"EUR": {"2015": 100.0, "2020": 105.0}, "USD": {"2015": 100.0, "2020": 108.0}},
+        exchange_rates={"EUR": {"2015": 1.1, "2020": 1.14}, "USD": {"2015": 1.0, "2020": 1.0}},
+    )
+    table_path = tmp_path / "currency_rates.json"
+    table_path.write_text(json.dumps(table.to_dict()))
+    table = load_currency_rate_table(table_path)
+    
+    assert table.convert_currency(10, "2015", "EUR", "2020", "USD") == pytest.approx(10 * 1.05 * 1.14)
+    assert table.convert_currency(10, "2015", "EUR", "2020", "USD", operation_order="exchange_first") == pytest.approx(10 * 1.1 * 1.08)
+    
+    converted_values = table.convert_currency_array([10, 20, 30, 40], [2015, 2020, 2015, 2010], ["EUR", "EUR", "USD", "EUR"], "2020", "USD")
+    assert converted_values[:3] == pytest.approx([10 * 1.05 * 1.14, 20 * 1.14, 30 * 1.08])
+    assert np.isnan(converted_values[3])
+
+    # The unit parser uses the table for currency conversion.
+    unit_parser = FastSymbolicUnitParser()
+    unit_parser._currency_converter = table
+    conv_value, _ = unit_parser.unit_conversion(10, [('€', 1, 'http://qudt.org/vocab/unit/CCY_EUR', 2015)], [('$', 1, 'http://qudt.org/vocab/unit/CCY_USD', 2020)])
+    assert conv_value == pytest.approx(10 * 1.05 * 1.14)
+
+
 if __name__ == "__main__":
     test_unit_conversion()
+    test_unit_conversion_array()
+    test_conversion_plans()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_currency_rate_table(Path(tmp_dir))
     print("All tests passed.")
\ No newline at end of file
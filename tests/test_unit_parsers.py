@@ -1,7 +1,19 @@
 import pytest
 import time
+import json
 import pprint
-from quinex_utils.parsers.unit_parser import FastSymbolicUnitParser
+import numpy as np
+from fractions import Fraction
+from thefuzz import process
+import quinex_utils.parsers.unit_parser
+from quinex_utils.parsers.unit_parser import FastSymbolicUnitParser, get_compound_unit_key
+from quinex_utils.functions import normalize_unit_span, normalize_unit_group
+from quinex_utils.parsers.utils.patterns import UNIT_TOKENIZATION_PATTERN
+from quinex_utils.parsers.utils.aho_corasick import AhoCorasickAutomaton
+from quinex_utils.parsers.utils.ngram_index import NgramIndex
+from quinex_utils.parsers.utils.unit_profiles import UnitParserProfile, get_unit_parser_profile
+from quinex_utils.parsers.utils.unit_tokenizer import tokenize_unit_string, scan_unit_string
+from quinex_utils.parsers.utils.unit_lookups import UNIT_LOOKUP_SOURCES, load_unit_lookups_from_json, load_unit_lookup_snapshot, create_unit_lookup_snapshot, build_derived_unit_lookups, freeze_lookup, get_unit_lookup_registry, resolve_unit_link, dimension_vector_to_key, process_for_string_matching, AMBIGUOUS_UNIT
 
 
 pp = pprint.PrettyPrinter(indent=1)
@@ -39,6 +51,34 @@ def test_unit_aggregation():
     unit = unit_parser.get_single_class_for_compound_unit(units, normalized_unit_string)
     assert unit == 'http://qudt.org/vocab/unit/MicroGM-PER-MilliL'    
 
+    # Units with non-integer dimension vectors prevent aggregation but not parsing.
+    units = unit_parser.parse("m²·sr/Pa√m")
+    assert [unit[2] for unit in units] == ['http://qudt.org/vocab/unit/M', 'http://qudt.org/vocab/unit/SR', 'http://qudt.org/vocab/unit/PA-M0dot5']
+    dimension_vector, dimension_vector_str, _, _, allow_conversion = unit_parser.get_compound_unit_conversion_info(units)
+    assert dimension_vector is None and dimension_vector_str is None and not allow_conversion
+
+
+def test_compound_unit_key():
+    unit_parser = FastSymbolicUnitParser()
+    spelling_variants = ["kg m s^-2", "m kg/s^2", "kg*m/s²", "kg m/s^2"]
+    compound_units = [unit_parser.parse_compound_unit_str(normalize_unit_span(s)[0]) for s in spelling_variants]
+    assert len({get_compound_unit_key(units) for units in compound_units}) == 1
+
+    # Spelling variants share the dimensional analysis.
+    for s in spelling_variants:
+        assert unit_parser.parse(s)[0][2] == 'http://qudt.org/vocab/unit/N'
+    assert unit_parser.single_class_candidate_cache.info()["misses"] == 1
+    assert unit_parser.single_class_candidate_cache.info()["hits"] == len(spelling_variants) - 1
+
+    # The intersection of applicable systems starts over if it is empty, so that units of 
+    # other systems that cancel out (e.g., 'g·g-1') do not prevent the aggregation.
+    for unit_string, unit in [
+            ("psi/psi*kg mol-1", "http://qudt.org/vocab/unit/KiloGM-PER-MOL"),
+            ("g·g-1·[Btu_IT].[lb_av]-1", "http://qudt.org/vocab/unit/BTU_IT-PER-LB"),
+            ('cd.lm-1 in·"', "http://qudt.org/vocab/unit/IN2"),
+        ]:
+        assert unit_parser.parse(unit_string) == [(unit_string, 1, unit, None)]
+
 
 def test_ucum_code_generation():
     unit_parser = FastSymbolicUnitParser(load_ucum_codes=True)
@@ -52,8 +92,295 @@ def test_ucum_code_generation():
         result = unit_parser.get_compound_ucum_codes(units)
         if result != true_result:
             raise ValueError(f"Expected {true_result} but got {result}")
+
+    # Cached results are not shared with the caller.
+    result = unit_parser.get_compound_ucum_codes(units_and_results[0][0])
+    result["/"] = None
+    assert unit_parser.get_compound_ucum_codes(units_and_results[0][0]) == units_and_results[0][1]
+
+    parsed_units = [unit_parser.parse("km/s"), None, unit_parser.parse("MW"), unit_parser.parse("km/s"), unit_parser.parse("€/kWh")]
+    ucum_codes = unit_parser.get_compound_ucum_codes_bulk(parsed_units)
+    assert ucum_codes == [{'/': 'km.s-1', '-1': 'km.s-1'}, None, {'/': 'MW', '-1': 'MW'}, {'/': 'km.s-1', '-1': 'km.s-1'}, []]
+    ucum_codes[0]["/"] = None
+    assert ucum_codes[3] == {'/': 'km.s-1', '-1': 'km.s-1'}
+
+    # Units can also be given as lists (e.g., after a JSON round trip).
+    units = json.loads(json.dumps(units_and_results[1][0]))
+    assert unit_parser.get_compound_ucum_codes(units) == units_and_results[1][1]
+
+    unknown_unit = [("xyz", 1, "http://qudt.org/vocab/unit/NOT-A-UNIT", None)]
+    with pytest.raises(ValueError):
+        unit_parser.get_compound_ucum_codes_bulk([unknown_unit])
+    assert unit_parser.get_compound_ucum_codes_bulk([unknown_unit], skip_errors=True) == [None]
         
 
+def test_unit_lookup_snapshot(tmp_path):
+    # The shipped snapshot must be up to date with the JSON files.
+    snapshot_lookups = load_unit_lookup_snapshot()
+    assert snapshot_lookups is not None, "Snapshot is stale. Run dev/parsers/update_lookups/6_create_lookup_snapshot.py."
+    derived_lookups = snapshot_lookups.pop("derived_lookups")
+    assert snapshot_lookups == freeze_lookup(load_unit_lookups_from_json())
+    assert derived_lookups["unit_link_table"] == build_derived_unit_lookups(snapshot_lookups)["unit_link_table"]
+    # Derived indexes are stored frozen, so that they can be used as loaded.
+    assert all(isinstance(uris, frozenset) for uris in derived_lookups["processed_surface_form_index"].values())
+    assert all(isinstance(uris, tuple) for uris in derived_lookups["reverse_symbol_label_lookup"].values())
+
+    # Changing a JSON file makes the snapshot stale.
+    for file_name in UNIT_LOOKUP_SOURCES.values():
+        (tmp_path / file_name).write_text('{"A": {}}' if file_name.startswith("ambiguous") else '{}')
+    create_unit_lookup_snapshot(tmp_path)
+    assert load_unit_lookup_snapshot(tmp_path) is not None
+    (tmp_path / "unit_symbol_lookup.json").write_text('{"m": ["http://qudt.org/vocab/unit/M"]}')
+    assert load_unit_lookup_snapshot(tmp_path) is None
+
+
+def test_shared_unit_lookup_registry():
+    # All parser instances share the same read-only lookup tables.
+    parser_a = FastSymbolicUnitParser()
+    parser_b = FastSymbolicUnitParser(load_ucum_codes=True)
+    registry = get_unit_lookup_registry()
+    assert parser_a.unit_symbol_lookup is parser_b.unit_symbol_lookup is registry.unit_symbol_lookup
+    assert parser_a.conversion_lookup is parser_b.conversion_lookup
+    assert parser_b.ucum_code_lookup is registry.get_ucum_code_lookup()
+
+    with pytest.raises(TypeError):
+        registry.unit_symbol_lookup["m"] = ("http://qudt.org/vocab/unit/MilliM",)
+    with pytest.raises(AttributeError):
+        registry.unit_priorities = {}
+
+
+def test_unit_parse_cache():
+    unit_parser = FastSymbolicUnitParser(cache_size=2)
+    first_result = unit_parser.parse("kWh")
+    first_result.append(("corrupted", 1, None, None))
+    assert unit_parser.parse("kWh") == [('kWh', 1, 'http://qudt.org/vocab/unit/KiloW-HR', None)]
+    assert unit_parser.cache_info()["hits"] == 1
+
+    # Negative results are cached too.
+    assert unit_parser.parse("not a unit") is None
+    assert unit_parser.parse("not a unit") is None
+    assert unit_parser.cache_info()["hits"] == 2
+
+    unit_parser.parse("MW")
+    assert unit_parser.cache_info()["evictions"] > 0
+    assert unit_parser.cache_info()["currsize"] == 2
+
+    unit_parser.clear_cache()
+    assert unit_parser.cache_info()["currsize"] == 0
+
+    # Caching can be disabled.
+    unit_parser = FastSymbolicUnitParser(cache_size=0)
+    assert unit_parser.parse("kWh") == unit_parser.parse("kWh")
+    assert unit_parser.cache_info()["currsize"] == 0
+
+
+def test_unit_link_table():
+    unit_parser = FastSymbolicUnitParser()
+    registry = get_unit_lookup_registry()
+    for surface_form in ["kWh", "MW", "Sv", "sieverts", "TB", "hours", "Hours", "mM", "m"]:
+        expected = resolve_unit_link(surface_form, registry.unit_symbol_lookup, registry.unit_label_lookup, registry.unit_priorities)
+        assert unit_parser.qudt_unit_linking(surface_form) == (None if expected == AMBIGUOUS_UNIT else expected)
+
+    # Units are prioritized independent of matches without priority.
+    assert unit_parser.qudt_unit_linking("Sv") == "http://qudt.org/vocab/unit/SV"
+    assert unit_parser.qudt_unit_linking("TB") == "http://qudt.org/vocab/unit/TeraBYTE"
+
+
+def test_dimension_matrix():
+    registry = get_unit_lookup_registry()
+    km_id = registry.unit_ids["http://qudt.org/vocab/unit/KiloM"]
+    hr_id = registry.unit_ids["http://qudt.org/vocab/unit/HR"]
+    km_per_hr = registry.dimension_matrix[km_id] - registry.dimension_matrix[hr_id]
+    assert list(km_per_hr) == [0, 0, 1, 0, 0, 0, -1, 0]
+    
+    # Packing dimension vectors is linear.
+    km_key = dimension_vector_to_key(registry.dimension_matrix[km_id])
+    hr_key = dimension_vector_to_key(registry.dimension_matrix[hr_id])
+    assert dimension_vector_to_key(km_per_hr) == km_key - hr_key
+    assert "http://qudt.org/vocab/unit/KiloM-PER-HR" in registry.conversion_lookup_by_dimension_key[km_key - hr_key][0.2777777777777778]
+
+
+def test_conversion_multiplier_matching():
+    registry = get_unit_lookup_registry()
+    km_per_hr = registry.conversion_multipliers["http://qudt.org/vocab/unit/KiloM"] / registry.conversion_multipliers["http://qudt.org/vocab/unit/HR"]
+    assert km_per_hr == Fraction(5, 18)
+
+    # The multiplier of a compound unit is rounded once to float before matching (e.g., 1000/3600 and 0.2777777777777778).
+    unit_parser = FastSymbolicUnitParser()
+    assert unit_parser.parse("km h^-1") == [("km h^-1", 1, "http://qudt.org/vocab/unit/KiloM-PER-HR", None)]
+
+    # Multipliers must match exactly. Prefixes that only cancel out in decimal do 
+    # not lead to questionable matches (e.g., BQ-PER-KiloGM or MilliL-PER-KiloGM).
+    for unit_string, uris in [
+            ("dm3.s-1 per g/m3", ["DeciM", "SEC", "GM", "M"]),
+            ("cm3.s-1 per Bq/kg", ["CentiM", "SEC", "BQ", "KiloGM"]),
+            ("mg cm^-2", ["MilliGM", "CentiM"]),
+        ]:
+        assert [unit[2] for unit in unit_parser.parse(unit_string)] == ["http://qudt.org/vocab/unit/" + uri for uri in uris]
+
+
+def test_applicable_system_bitmasks():
+    registry = get_unit_lookup_registry()
+    for uri, info in registry.unit_dimensions_and_kinds.items():
+        assert registry.get_applicable_systems(registry.applicable_system_bitmasks[uri]) == set(info["applicable_system"])
+
+    unit_parser = FastSymbolicUnitParser()
+    units = unit_parser.parse_compound_unit_str("km / h")
+    _, _, _, applicable_systems, _ = unit_parser.get_compound_unit_conversion_info(units)
+    assert applicable_systems == set(registry.unit_dimensions_and_kinds["http://qudt.org/vocab/unit/KiloM"]["applicable_system"]) & set(registry.unit_dimensions_and_kinds["http://qudt.org/vocab/unit/HR"]["applicable_system"])
+
+
+def test_exact_surface_form_tie_breaking():
+    # A surface form equal to the query after normalization must be the best fuzzy match.
+    registry = get_unit_lookup_registry()
+    ambiguous_buckets = [uris for multipliers in registry.conversion_lookup_by_dimension_key.values() for uris in multipliers.values() if len(uris) > 1]
+    for uris in ambiguous_buckets[:50]:
+        for query in [surface_form.replace(" ", "") for uri in uris for surface_form in registry.reverse_symbol_label_lookup.get(uri, ())]:
+            exact_matches = registry.processed_surface_form_index.get(process_for_string_matching(query, is_query=True), ())
+            exact_match = next((uri for uri in uris if uri in exact_matches), None)
+            if exact_match is not None:
+                similarity_scores = [process.extractOne(query, registry.reverse_symbol_label_lookup.get(uri))[1] for uri in uris]
+                assert exact_match == uris[int(np.argmax(similarity_scores))]
+
+
+def test_unit_tokenization():
+    unit_strings = ["$(kWh)-1", "cents kWh-1", "TWh kg*s^2/(m^2 per year)^3", "$_{2021}/kWh", "€2019 /MWh", "(m)^2/(s)", "W m-2 K-1", "kg\tm(x)(y))", "[kg]{m}-5"]
+    for unit_string in unit_strings:
+        assert scan_unit_string(unit_string) == [part for part in UNIT_TOKENIZATION_PATTERN.split(unit_string) if part not in ['', ' ']]
+
+    long_unit_string = " ".join(unit_strings * 20)
+    assert tokenize_unit_string(long_unit_string) == [part for part in UNIT_TOKENIZATION_PATTERN.split(long_unit_string) if part not in ['', ' ']]
+
+    # Nested parentheses are kept intact.
+    assert tokenize_unit_string("((m)^2/(s))^2") == ["((m)^2/(s))", "^", "2"]
+    assert tokenize_unit_string("kg\tm(x(y))") == ["kg", "\t", "m", "(x(y))"]
+
+
+def test_unit_group_normalization(monkeypatch):
+    for unit_string in ["m^2 per year", "kg/(per year)", "J/(x kg K)", "W m-2 K-1:"]:
+        normalized_unit_string, _ = normalize_unit_span(unit_string)
+        assert normalize_unit_group(normalized_unit_string) == normalize_unit_span(normalized_unit_string)
+
+    # Only the root of nested unit groups is normalized.
+    normalize_calls = []
+    def count_normalize_unit_span(*args, **kwargs):
+        normalize_calls.append(args)
+        return normalize_unit_span(*args, **kwargs)
+    monkeypatch.setattr(quinex_utils.parsers.unit_parser, "normalize_unit_span", count_normalize_unit_span)
+
+    unit_parser = FastSymbolicUnitParser(cache_size=0)
+    units = unit_parser.parse("kg/(m (per year))^2")
+    assert [(unit[0], unit[1]) for unit in units] == [("kg", 1), ("m", -2), ("per year", -2)]
+    assert len(normalize_calls) == 1
+
+    # The exponent of a subgroup does not change the exponents of the following units.
+    for unit_string, expected_units in [("J/((m)^2 K)", [("J", 1), ("m", -2), ("K", -1)]), ("W/(m^2 (K)^2 s)", [("W", 1), ("m", -2), ("K", -2), ("s", -1)])]:
+        units = unit_parser.parse(unit_string)
+        assert [(unit[0], unit[1]) for unit in units] == expected_units
+    assert unit_parser.parse("kg/((m)^2 s)")[0][2] == 'http://qudt.org/vocab/unit/KiloGM-PER-M2-SEC'
+
+    # '((m)^2/(s))^2' is m^4 s^-2.
+    units = unit_parser.parse("((m)^2/(s))^2")
+    assert [unit[2] for unit in units] == ['http://qudt.org/vocab/unit/J-M2-PER-KiloGM']
+
+    # If a nested unit group cannot be parsed, the whole unit string cannot be parsed.
+    for unit_string in ["$XPD$/(#/(m²·d) [yd_i]3.s-1)^2", "/K/(mg/K Btu (39 °F))^2", "g/(dm³·K)/(μW/m² g{carbon}/(m²·day))^2"]:
+        assert unit_parser.parse(unit_string) is None
+
+    # Unit groups within unit groups that cannot be parsed are not ignored.
+    assert unit_parser.parse("kg/(m (HHV))^2") is None
+
+    # Other unit groups that cannot be parsed are annotations and are ignored.
+    assert [unit[2] for unit in unit_parser.parse("% (HHV)")] == ["http://qudt.org/vocab/unit/PERCENT"]
+
+
+def test_aho_corasick_automaton():
+    automaton = AhoCorasickAutomaton(["he", "she", "his", "hers", ""])
+    assert sorted(automaton.iter_matches("ushers")) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+    assert list(automaton.iter_matches("")) == []
+
+    # Incremental matching.
+    state = 0
+    for c in "ush":
+        state = automaton.get_next_state(state, c)
+        assert not automaton.is_match_state(state)
+    assert automaton.is_match_state(automaton.get_next_state(state, "e"))
+
+
+def test_find_unit_mentions():
+    unit_parser = FastSymbolicUnitParser()
+    text = "The electrolyser consumed 52.4kWh of electricity at 80 °C. Kilowatt hours, not kWhs."
+    unit_mentions = [(text[start:end], surface_form, uri) for start, end, surface_form, uri in unit_parser.find_unit_mentions(text)]
+    assert ("kWh", "kWh", "http://qudt.org/vocab/unit/KiloW-HR") in unit_mentions
+    assert ("°C", "°C", "http://qudt.org/vocab/unit/DEG_C") in unit_mentions
+    assert ("Kilowatt hours", "Kilowatt hours", "http://qudt.org/vocab/unit/KiloW-HR") in unit_mentions
+    
+    # Mentions do not overlap and are at token boundaries.
+    assert not any(surface_form in ["watt", "hour"] for _, surface_form, _ in unit_mentions)
+    assert all(surface_form not in ["city", "e"] for _, surface_form, _ in unit_mentions)
+
+
+def test_fuzzy_fallback():
+    ngram_index = NgramIndex(["kilowatt hour", "kilowatt hours", "megawatt"])
+    assert ngram_index.search("kilowatt hours")[0] == ("kilowatt hours", 1.0)
+    assert ngram_index.search("xyz") == []
+
+    # Fuzzy fallback is disabled by default.
+    assert FastSymbolicUnitParser().parse("kilowat hours") is None
+
+    unit_parser = FastSymbolicUnitParser(fuzzy_fallback=True)
+    assert unit_parser.parse("kilowat hours") == [("kilowat hours", 1, "http://qudt.org/vocab/unit/KiloW-HR", None)]
+    assert unit_parser.fuzzy_unit_linking("Mwh") == ("http://qudt.org/vocab/unit/MegaW-HR", 1.0)
+    assert unit_parser.parse("qwerty") is None
+
+
+def test_expected_quantity_kind():
+    unit_parser = FastSymbolicUnitParser()
+    units_by_quantity_kind = unit_parser.lookup_registry.get_units_by_quantity_kind()
+    assert "http://qudt.org/vocab/unit/ARE" in units_by_quantity_kind["Area"]
+    assert "Area" in unit_parser.lookup_registry.get_unit_quantity_kinds()["http://qudt.org/vocab/unit/ARE"]
+
+    # Ambiguous surface forms are resolved among the units of the expected kind or dimension.
+    assert unit_parser.parse("a")[0][2] == "http://qudt.org/vocab/unit/YR"
+    assert unit_parser.parse("a", expected_kind="Area")[0][2] == "http://qudt.org/vocab/unit/ARE"
+    assert unit_parser.parse("a", expected_kind="http://qudt.org/vocab/quantitykind/Area")[0][2] == "http://qudt.org/vocab/unit/ARE"
+    assert unit_parser.parse("a", expected_dimension="A0E0L2I0M0H0T0D0")[0][2] == "http://qudt.org/vocab/unit/ARE"
+    assert unit_parser.qudt_unit_linking("C", expected_kind="Temperature") == "http://qudt.org/vocab/unit/DEG_C"
+    assert unit_parser.parse("km/s", expected_kind="Velocity")[0][2] == "http://qudt.org/vocab/unit/KiloM-PER-SEC"
+    assert unit_parser.parse("m", expected_kind="Time")[0][2] == "http://qudt.org/vocab/unit/MIN"
+    assert unit_parser.parse("kg", expected_kind="Time") is None
+
+    with pytest.raises(ValueError):
+        unit_parser.parse("a", expected_kind="NotAQuantityKind")
+
+
+def test_unit_parser_profiles(tmp_path):
+    unit_parser = FastSymbolicUnitParser(profile="energy_systems")
+    full_unit_parser = FastSymbolicUnitParser()
+    assert len(unit_parser.unit_dimensions_and_kinds) < len(full_unit_parser.unit_dimensions_and_kinds) / 5
+    assert unit_parser.lookup_registry is not full_unit_parser.lookup_registry
+
+    # Units outside the profile are not linked, which also resolves ambiguities.
+    assert unit_parser.parse("€/MWh") == full_unit_parser.parse("€/MWh")
+    assert unit_parser.parse("m")[0][2] == "http://qudt.org/vocab/unit/MIN"
+    assert unit_parser.parse("km/s") is None
+
+    # Profiles are serializable and registries of profiles with the same units are shared.
+    profile = UnitParserProfile("energy_and_length", quantity_kinds=["Energy"], uri_prefixes=["http://qudt.org/vocab/unit/CCY_"], dimension_vectors=["A0E0L1I0M0H0T0D0"])
+    profile_path = profile.save(tmp_path / "profile.json")
+    assert get_unit_parser_profile(profile_path) == profile
+    assert get_unit_parser_profile(profile.to_dict()) == profile
+    unit_parser_a = FastSymbolicUnitParser(profile=profile)
+    unit_parser_b = FastSymbolicUnitParser(profile=profile_path)
+    assert unit_parser_a.lookup_registry is unit_parser_b.lookup_registry
+    assert unit_parser_a.parse("km")[0][2] == "http://qudt.org/vocab/unit/KiloM"
+    assert unit_parser_a.parse("$")[0][2] == "http://qudt.org/vocab/unit/CCY_USD"
+    assert unit_parser_a.parse("kg") is None
+
+    with pytest.raises(ValueError):
+        FastSymbolicUnitParser(profile="not_a_profile")
+
+
 if __name__ == "__main__":
     
     start = time.perf_counter()